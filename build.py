@@ -1,126 +1,477 @@
-import copy
 import json
 import os
+import sys
+import threading
+from functools import cache
+from importlib.util import find_spec
 from pathlib import Path
 from shutil import rmtree
 
+from hipeac_press.prefetch import set_prefetch_hints
+from hipeac_press.preflight import preflight, preflight_report
 from hipeac_press.reader import Reader
 from hipeac_press.recommendations import generate_recommendations
-from hipeac_press.type_definitions import NavItem
+from hipeac_press.transformers import get_transformer
+from hipeac_press.type_definitions import Image
+from hipeac_press.utils.build_manifest import (
+    PRESS_PATHS,
+    create_build_manifest,
+    diff_outputs,
+    hash_file,
+    hash_files,
+    read_build_manifest,
+    write_build_manifest,
+)
+from hipeac_press.utils.checkpoint import Checkpoints, hash_values
 from hipeac_press.utils.epub import generate_epub
-from hipeac_press.utils.pdf import concatenate_pdfs, set_headers_footers
+from hipeac_press.utils.memory import bounded_workers, memory_report, spill_tree
+from hipeac_press.utils.pdf import concatenate_pdfs, set_headers_footers, split_sections
+from hipeac_press.utils.render_costs import RenderCosts, run_longest_first
+from hipeac_press.utils.scheduler import Scheduler
+from hipeac_press.utils.search import generate_search_index
+from hipeac_press.utils.static_site import generate_static_site
+from hipeac_press.utils.sync import mirror, write_errors
+from hipeac_press.utils.watchdog import render_with_watchdog, slowest_report
 
 
 PARENT = Path(__file__).parent
 VISION_YEAR = os.environ.get("VISION_YEAR", "2025")
 VISION_PATH = Path(os.environ.get("VISION_SOURCE_PATH", "/Users/eillarra/Nextcloud/hipeac/Vision/2025/Website"))
+BUILD_CACHE_PATH = Path(os.environ.get("BUILD_CACHE_PATH", PARENT / ".cache"))
+BUILD_LINEARIZE_PDF = os.environ.get("BUILD_LINEARIZE_PDF") == "1"
+BUILD_PROFILE = os.environ.get("BUILD_PROFILE", "final")  # "draft" renders review PDFs, without the book or stamping
+BUILD_MEMORY_BUDGET = int(os.environ.get("BUILD_MEMORY_BUDGET", 0)) * 2**20 or None  # MB, enables low-memory mode
+BUILD_WORKER_MEMORY = int(os.environ.get("BUILD_WORKER_MEMORY", 256)) * 2**20  # MB, estimated per worker process
+BUILD_WORKERS = bounded_workers(
+    int(os.environ.get("BUILD_WORKERS", os.cpu_count() or 1)), BUILD_MEMORY_BUDGET, BUILD_WORKER_MEMORY
+)
+BUILD_RENDER_TIMEOUT = float(os.environ.get("BUILD_RENDER_TIMEOUT", 600)) or None  # seconds per article
+BUILD_RENDER_MEMORY = int(os.environ.get("BUILD_RENDER_MEMORY", 0)) * 2**20 or None  # MB of RSS per article
+BUILD_PREFETCH_BUDGET = int(os.environ.get("BUILD_PREFETCH_BUDGET", 512)) * 2**10  # KB prefetched per article
+BUILD_PREFLIGHT = os.environ.get("BUILD_PREFLIGHT", "warn")  # "fail" stops the build if the sources have problems
+BUILD_EPUB_SPLIT = os.environ.get("BUILD_EPUB_SPLIT") == "1"  # one EPUB chapter per H2 section, for e-readers
+BUILD_HTML_PATH = os.environ.get("BUILD_HTML_PATH")  # write the static HTML site here, e.g. /app/html
+BUILD_STAGE_WORKERS = 1 if BUILD_MEMORY_BUDGET else int(os.environ.get("BUILD_STAGE_WORKERS", 4))
+BUILD_RESUME = "--resume" in sys.argv  # skip the work a failed build already completed
 
 origin_path = PARENT / ".source"
 destination_path = PARENT / ".build"
 images_path = destination_path / "images"
+pdf_path = PARENT / "public" / "pdf"
+epub_path = PARENT / "public" / "epub"
+logo_path = PARENT / "public" / "hipeac.svg"
+
+# the build is a graph of stages: each stage runs as soon as the stages producing its inputs are done
+
+build = Scheduler(max_workers=BUILD_STAGE_WORKERS)
+tree = []
+site = None
+
+# completed work is checkpointed with the hash of its inputs: the press code, the options changing the outputs and,
+# for every article, the cache key of its PDF (HTML, template and images); both are loaded by `main`, as the fork
+# server imports this module too
+
+checkpoints = None
+build_inputs = None
+article_inputs = {}
+article_inputs_lock = threading.Lock()  # the epub and pdf stages run concurrently
+pdf_cache_keys = {}
+
+
+def get_article_inputs(item) -> str:
+    """Return the hash of the inputs of an article, recording the cache key of its PDF."""
+    with article_inputs_lock:
+        if item.slug not in article_inputs:
+            transformer = get_transformer("pdf").from_kwargs(
+                item.document, build_path=destination_path, profile=BUILD_PROFILE
+            )
+            pdf_cache_keys[item.slug] = transformer.fingerprint()
+            article_inputs[item.slug] = hash_values(build_inputs, item.slug, pdf_cache_keys[item.slug])
+        return article_inputs[item.slug]
+
+
+@cache
+def get_book_inputs() -> str:
+    """Return the hash of the inputs of the book: the inputs of every article, their sections and the cover."""
+    cover_pdf = VISION_PATH / "cover.pdf"
+    return hash_values(
+        build_inputs,
+        [(section["text"], get_article_inputs(item)) for section in tree for item in section["items"]],
+        hash_file(cover_pdf) if cover_pdf.exists() else None,
+    )
 
-rmtree(destination_path, ignore_errors=True)
-rmtree(origin_path, ignore_errors=True)
 
-destination_path.mkdir(exist_ok=True)
-origin_path.mkdir(exist_ok=True)
-images_path.mkdir(parents=True, exist_ok=True)
+def write_folder_errors(errors_by_folder: dict[Path, list[str]]):
+    """Write the errors of every source folder to its errors.txt file, in the Vision folder and in its mirror."""
+    for folder, folder_errors in errors_by_folder.items():
+        write_errors(
+            folder_errors,
+            VISION_PATH / folder.relative_to(origin_path) / "errors.txt",
+            mirror_path=folder / "errors.txt",
+        )
 
-os.system(f'cp -r "{VISION_PATH}"/* "{origin_path}"')
 
-reader = Reader(origin_path, img_folder=images_path)
-tree = reader.tree
+# only copy new or changed files from the (network-mounted) Vision folder
+
+
+@build.stage(outputs=["source"])
+def mirror_source():
+    """Copy the new or changed files of the Vision folder to the source folder."""
+    mirror(VISION_PATH, origin_path, checksum=os.environ.get("BUILD_MIRROR_CHECKSUM") == "1")
+
+
+# check the sources cheaply before converting and rendering them
+
+
+@build.stage(inputs=["source"], outputs=["preflight"])
+def preflight_check():
+    """Check the sources cheaply, printing the problems found, or writing them and stopping in `fail` mode."""
+    preflight_errors = preflight(origin_path, workers=BUILD_WORKERS)
+    print(preflight_report(preflight_errors, origin_path))
+
+    if BUILD_PREFLIGHT == "fail" and any(preflight_errors.values()):
+        folders = {}
+        for docx_path, docx_errors in preflight_errors.items():
+            folders.setdefault(docx_path.parent, []).extend(docx_errors)
+        write_folder_errors(folders)
+        raise RuntimeError("Preflight found problems in the sources, see the errors.txt files")
+
+
+@build.stage(inputs=["source", "preflight"], outputs=["tree", "images"])
+def read_tree():
+    """Convert the DOCX files and read the tree of sections and articles."""
+    global tree, site
+    reader = Reader(origin_path, img_folder=images_path, workers=BUILD_WORKERS)
+    tree = reader.tree
+    site = reader.manifest  # sections, slugs, titles and navigation, without the converters
 
 
 # generate recommendations
 
-tree = generate_recommendations(tree)
+
+@build.stage(inputs=["tree"], outputs=["recommendations"])
+def recommendations():
+    """Generate the recommendations linking the articles."""
+    generate_recommendations(tree)
+
+
+# hint the next article and its first images; in low-memory mode, the documents are then spilled to disk
+
+
+@build.stage(inputs=["recommendations", "images"], outputs=["content"])
+def prefetch_hints():
+    """Set the prefetch hints of every article, then spill the documents to disk in low-memory mode."""
+    set_prefetch_hints(tree, budget=BUILD_PREFETCH_BUDGET)
+
+    if BUILD_MEMORY_BUDGET:
+        spill_tree(tree, BUILD_CACHE_PATH / "documents")
 
 
 # generate files: md, pdf
 
-for section_index, section in enumerate(tree):
-    for i, item in enumerate(section["items"]):
-        prev_item = section["items"][i - 1] if i > 0 else None
-        next_item = section["items"][i + 1] if i < len(section["items"]) - 1 else None
 
-        if prev_item is None and section_index > 0:
-            prev_item = tree[section_index - 1]["items"][-1]
-        if next_item is None and section_index < len(tree) - 1:
-            next_item = tree[section_index + 1]["items"][0]
+@build.stage(inputs=["content"], outputs=["md"])
+def markdown():
+    """Write the markdown file of every article and record its hash in the site manifest."""
+    for section in tree:
+        for item in section["items"]:
+            with open(destination_path / f"{item.slug}.md", "wb") as f:
+                item.write(f, format="md")
+
+            site[item.slug].hash = hash_file(destination_path / f"{item.slug}.md")
+
+
+# PDFs are rendered in child processes that are stopped if they overrun their time or memory budget; the renderings
+# expected to take longest (from previous builds, or the DOCX size and image count) are started first; the costs are
+# loaded by `main`
+
+render_costs = None
+
+
+@build.stage(inputs=["content", "images"], outputs=["pdf"])
+def pdf():
+    """Render the PDFs of the articles that are not checkpointed, the longest renderings first."""
+    jobs = {}
+    cached = set()
+    items = {}
+
+    for section in tree:
+        for item in section["items"]:
+            inputs = get_article_inputs(item)
+
+            # the PDF may already be stamped, which is fine if the book made from the unstamped PDFs is done too
+            if checkpoints.get(f"pdf/{item.slug}", inputs) or (
+                checkpoints.get("book", get_book_inputs())
+                and checkpoints.get(f"headers_footers/{item.slug}", hash_values(get_book_inputs(), inputs))
+            ):
+                continue
 
-        item.set_prev(NavItem(text=prev_item.title, link=f"/{prev_item.slug}") if prev_item else None)
-        item.set_next(NavItem(text=next_item.title, link=f"/{next_item.slug}") if next_item else None)
+            items[item.slug] = (section, item, inputs)
 
-        for file_format in ["md", "pdf"]:
-            file_path = destination_path
-            if file_format != "md":
-                file_path = PARENT / "public" / file_format
-                if not file_path.exists():
-                    file_path.mkdir(parents=True, exist_ok=True)
-            with open(file_path / f"{item.slug}.{file_format}", "wb") as f:
-                f.write(item.export(format=file_format, build_path=destination_path, section_name=section["text"]))
+            if (BUILD_CACHE_PATH / "pdf" / f"{pdf_cache_keys[item.slug]}.pdf").exists():
+                cached.add(item.slug)  # only copied from the PDF cache
+                jobs[item.slug] = 0.0
+            else:
+                jobs[item.slug] = render_costs.estimate(
+                    item.slug,
+                    docx_size=item._docx_path.stat().st_size,
+                    images=sum(isinstance(element, Image) for element in item.document.elements),
+                )
 
-        # try removing existing errors.txt file (itmight not be there)
-        try:
-            os.remove(VISION_PATH / item._docx_path.parent.relative_to(origin_path) / "errors.txt")
-        except FileNotFoundError:
-            pass
+    def render(slug: str) -> float:
+        section, item, inputs = items[slug]
+        seconds = render_with_watchdog(
+            item,
+            pdf_path / f"{item.slug}.pdf",
+            timeout=BUILD_RENDER_TIMEOUT,
+            memory_limit=BUILD_RENDER_MEMORY,
+            build_path=destination_path,
+            section_name=section["text"],
+            cache_path=BUILD_CACHE_PATH / "pdf",
+            profile=BUILD_PROFILE,
+        )
 
-        if item.errors:  # Write errors to a txt file if there are any
-            vision_parent_path = VISION_PATH / item._docx_path.parent.relative_to(origin_path)
-            with open(vision_parent_path / "errors.txt", "w") as error_file:
-                error_file.write("\n".join(item.errors))
+        if (pdf_path / f"{item.slug}.pdf").exists():
+            checkpoints.record(f"pdf/{item.slug}", inputs, [pdf_path / f"{item.slug}.pdf"])
+
+        return seconds
+
+    render_timings = run_longest_first(jobs, render, workers=1 if BUILD_MEMORY_BUDGET else BUILD_WORKERS)
+
+    for slug, seconds in render_timings.items():
+        # a failed rendering has no PDF, and its time (e.g. the whole timeout) is not the cost of the article
+        if slug not in cached and (pdf_path / f"{slug}.pdf").exists():
+            render_costs.record(slug, seconds=seconds)
+
+    render_costs.save()
+    print(slowest_report(render_timings))
+
+
+# write errors to a txt file if there are any, touching the Vision folder only if they changed; the preflight problems
+# are only printed, as preflight reads the raw text of the DOCX files and can warn about text the conversion skips
+
+
+@build.stage(inputs=["pdf"], outputs=["errors"])
+def errors():
+    """Write the errors of every article to the errors.txt file of its folder."""
+    folders = {}
+
+    for section in tree:
+        for item in section["items"]:
+            folders.setdefault(item._docx_path.parent, []).extend(item.errors)
+
+    write_folder_errors(folders)
 
 
 # copy general files to the destination folder
 
-for file in ["cover.jpg"]:
-    os.system(f"cp {origin_path / file} {destination_path / file}")
-    os.system(f"cp {origin_path / file} {PARENT / 'public'}")
 
-for file in ["index.md", "archive.md"]:
-    os.system(f"cp {origin_path / file} {destination_path / file}")
-    os.system(f"cp {origin_path / file} {destination_path}")
+@build.stage(inputs=["source"], outputs=["static"])
+def static_files():
+    """Copy the cover and the index pages to the build and public folders."""
+    for file in ["cover.jpg"]:
+        os.system(f"cp {origin_path / file} {destination_path / file}")
+        os.system(f"cp {origin_path / file} {PARENT / 'public'}")
+
+    for file in ["index.md", "archive.md"]:
+        os.system(f"cp {origin_path / file} {destination_path / file}")
+        os.system(f"cp {origin_path / file} {destination_path}")
 
 
 # generate epub
 
-epub_path = PARENT / "public" / "epub"
-epub_path.mkdir(parents=True, exist_ok=True)
 
-epub = generate_epub(
-    tree,
-    destination_path,
-    epub_path / f"hipeac-vision-{VISION_YEAR}.epub",
-    title=f"HiPEAC Vision {VISION_YEAR}",
-)
+@build.stage(inputs=["content", "images", "static"], outputs=["epub"])
+def epub():
+    """Generate the EPUB of the whole Vision."""
+    epub_file = epub_path / f"hipeac-vision-{VISION_YEAR}.epub"
+    inputs = hash_values(
+        build_inputs,
+        [get_article_inputs(item) for section in tree for item in section["items"]],
+        hash_file(origin_path / "cover.jpg"),
+    )
+
+    if checkpoints.get("epub", inputs):
+        return
+
+    generate_epub(
+        tree, destination_path, epub_file, title=f"HiPEAC Vision {VISION_YEAR}", split_chapters=BUILD_EPUB_SPLIT
+    )
+    checkpoints.record("epub", inputs, [epub_file])
 
 
 # create sibebar.json file
 
-with open(destination_path / "sidebar.json", "w") as navigation_file:
-    submenu = []
-    for section in copy.deepcopy(tree):
-        section["items"] = [{"text": docx.title, "link": docx.slug} for docx in section["items"]]
-        submenu.append(section)
-    navigation_file.write(json.dumps(submenu))
 
+@build.stage(inputs=["tree", "book"], outputs=["sidebar"])
+def sidebar():
+    """Write the sidebar of the website."""
+    with open(destination_path / "sidebar.json", "w") as navigation_file:
+        navigation_file.write(json.dumps(site.sidebar()))
 
-# concatenate PDFs without headers and footers
 
-concatenate_pdfs(tree, PARENT / "public" / "pdf", VISION_YEAR, cover_pdf=VISION_PATH / "cover.pdf")
+# create sharded search index, served from the public folder
 
 
-# set headers and footers for individual PDFs
+@build.stage(inputs=["content"], outputs=["search"])
+def search():
+    """Write the sharded search index."""
+    generate_search_index(tree, PARENT / "public" / "search")
+
+
+# concatenate PDFs without headers and footers, and split the stamped book into one PDF per section (not for drafts)
+
+
+@build.stage(inputs=["pdf"], outputs=["book"])
+def book():
+    """Concatenate the article PDFs into the book, and split it into one PDF per section."""
+    if BUILD_PROFILE == "draft":
+        return
+
+    section_pdfs = checkpoints.get("book", get_book_inputs())
+
+    if not section_pdfs:
+        section_pdfs = make_book()
+        checkpoints.record(
+            "book",
+            get_book_inputs(),
+            [pdf_path / f"hipeac-vision-{VISION_YEAR}.pdf", *(pdf_path / name for name in section_pdfs.values())],
+            value=section_pdfs,
+        )
+
+    for section in site.sections:
+        section.pdf = section_pdfs.get(section.text)
 
-logo_path = PARENT / "public" / "hipeac.svg"
 
-for _, section in enumerate(tree):
-    for item in section["items"]:
-        set_headers_footers(item, PARENT / "public" / "pdf", VISION_YEAR, logo_path)
+def make_book() -> dict[str, str]:
+    """Concatenate the article PDFs into the book and split it, returning the PDF file of every section."""
+    ranges = concatenate_pdfs(
+        tree,
+        pdf_path,
+        VISION_YEAR,
+        cover_pdf=VISION_PATH / "cover.pdf",
+        linearize=BUILD_LINEARIZE_PDF,
+        low_memory=BUILD_MEMORY_BUDGET is not None,
+    )
+    return split_sections(
+        pdf_path, VISION_YEAR, ranges, linearize=BUILD_LINEARIZE_PDF, low_memory=BUILD_MEMORY_BUDGET is not None
+    )
+
+
+# set headers and footers for individual PDFs, once the book is made from the PDFs without them (not for drafts)
+
+
+@build.stage(inputs=["pdf", "book"], outputs=["stamped_pdf"])
+def headers_footers():
+    """Stamp the headers and footers of the article PDFs, recording their page counts."""
+    if BUILD_PROFILE == "draft":
+        return
+
+    for section in tree:
+        for item in section["items"]:
+            if (pdf_path / f"{item.slug}.pdf").exists():
+                inputs = hash_values(get_book_inputs(), get_article_inputs(item))
+                pages = checkpoints.get(f"headers_footers/{item.slug}", inputs)
+
+                if not pages:
+                    pages = set_headers_footers(item, pdf_path, VISION_YEAR, logo_path, linearize=BUILD_LINEARIZE_PDF)
+                    checkpoints.record(f"headers_footers/{item.slug}", inputs, [pdf_path / f"{item.slug}.pdf"], pages)
+
+                site[item.slug].pages = pages
+                render_costs.record(item.slug, pages=pages)
+
+    render_costs.save()
+
+
+@build.stage(inputs=["md", "stamped_pdf"], outputs=["site"])
+def site_manifest():
+    """Write the site manifest."""
+    site.write(destination_path / "site.json")
 
 
 # copy public folder to .md folder
 
-os.system(f"cp -r {PARENT / 'public'} {destination_path / 'public'}")
+
+@build.stage(inputs=["static", "epub", "search", "stamped_pdf"], outputs=["public"])
+def public():
+    """Copy the public folder to the build folder."""
+    rmtree(destination_path / "public", ignore_errors=True)
+    os.system(f"cp -r {PARENT / 'public'} {destination_path / 'public'}")
+
+
+# write the static HTML site, so content-only updates can skip the Vitepress build
+
+
+if BUILD_HTML_PATH:
+
+    @build.stage(inputs=["content", "images", "static", "site", "public"], outputs=["html"])
+    def static_site():
+        """Write the pages of the website that changed, with their assets."""
+        changes = generate_static_site(
+            tree,
+            site,
+            Path(BUILD_HTML_PATH),
+            build_path=destination_path,
+            public_path=PARENT / "public",
+            year=VISION_YEAR,
+        )
+        print(f"Static site: {len(changes)} files written or removed")
+
+
+# write the build manifest and list the outputs that changed since the previous build
+
+
+@build.stage(inputs=["public", "sidebar", "site", "errors"], outputs=["manifest"])
+def build_manifest():
+    """Write the build manifest and print the outputs that changed since the previous build."""
+    (destination_path / "manifest.json").unlink(missing_ok=True)  # left by a previous build if resuming
+    manifest = create_build_manifest(origin_path, {"build": destination_path})
+    previous_manifest = read_build_manifest(BUILD_CACHE_PATH / "manifest.json")
+
+    for change, paths in diff_outputs(previous_manifest, manifest)["build"].items():
+        for path in paths:
+            print(f"{change}: {path}")
+
+    write_build_manifest(manifest, destination_path / "manifest.json")
+    write_build_manifest(manifest, BUILD_CACHE_PATH / "manifest.json")
+
+
+# the fork server starting the child processes imports this module, so the build only runs as a script
+
+
+def main():
+    """Run the build and print its reports."""
+    global checkpoints, build_inputs, render_costs
+
+    if BUILD_LINEARIZE_PDF and find_spec("pikepdf") is None:
+        sys.exit("BUILD_LINEARIZE_PDF=1 needs the optional pikepdf package: poetry install --extras pdf")
+
+    checkpoints = Checkpoints(BUILD_CACHE_PATH / "checkpoints.json", resume=BUILD_RESUME)
+    build_inputs = hash_values(
+        hash_files(PARENT, PRESS_PATHS),
+        VISION_YEAR,
+        BUILD_PROFILE,
+        BUILD_LINEARIZE_PDF,
+        BUILD_MEMORY_BUDGET is not None,
+        BUILD_EPUB_SPLIT,
+    )
+    render_costs = RenderCosts(BUILD_CACHE_PATH / f"render_costs.{BUILD_PROFILE}.json")
+
+    if not BUILD_RESUME:
+        rmtree(destination_path, ignore_errors=True)
+
+    destination_path.mkdir(exist_ok=True)
+    images_path.mkdir(parents=True, exist_ok=True)
+    pdf_path.mkdir(parents=True, exist_ok=True)
+    epub_path.mkdir(parents=True, exist_ok=True)
+
+    build.run()
+    print(build.report())
+    print(memory_report(BUILD_MEMORY_BUDGET))
+
+    if BUILD_RESUME:
+        print(checkpoints.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import re
+from collections.abc import Iterable
+
+from .type_definitions import BulletList, Image, OrderedList, Paragraph, Quote, Reference
+from .utils.slug import slugify, unique_slug
+
+
+BRACKETS_REGEX = re.compile(r"\[([^\]]+)\]")
+
+
+def _citations_end(text: str) -> int:
+    """Return the position after the last closing bracket of a text.
+
+    Citations can only be found before it. Scanning only up to there keeps an opening bracket without a closing one
+    from making every following opening bracket scan to the end of the text again.
+    """
+    return text.rfind("]") + 1
+
+
+def split_citation(text: str) -> list[str]:
+    """Split the text between brackets into citation codes.
+
+    A text with a comma that is neither its first nor its last character is a list of codes: `[a, b]`.
+    """
+    if "," in text[1:-1]:
+        return [code.strip() for code in text.split(",")]
+    return [text]
+
+
+def parse_reference(text: str) -> Reference:
+    """Parse an entry of the references section: `[code] text`.
+
+    :raises IndexError: If the entry has no closing bracket.
+    """
+    code = text.split("]")[0][1:]
+    return Reference(code=code, text=text.split("]")[1].strip())
+
+
+def reference_ids(references: list[Reference]) -> dict[str, str]:
+    """Return the HTML ids of the references of a document, used as the targets of citation links.
+
+    Codes that give the same slug, like `A.1` and `A1`, get a `-1`, `-2`... suffix in the order of the references.
+    """
+    ids = {}
+    taken = set()
+
+    for ref in references:
+        if ref.code not in ids:
+            ids[ref.code] = unique_slug(f"ref-{slugify(ref.code)}", taken)
+
+    return ids
+
+
+def _to_footnote(match: re.Match) -> str:
+    text = match.group(1)
+    codes = split_citation(text)
+
+    if len(codes) > 1:
+        return "".join(f"[^{code}]" for code in codes)
+    if text[0] in "^!":  # already a footnote, or image alt text
+        return match.group(0)
+    return f"[^{text}]"
+
+
+def to_footnotes(text: str) -> str:
+    """Convert citations to markdown footnotes in a single pass.
+
+    Converts:
+    - [number] to [^number]
+    - [text] to [^text]
+    - [text1, text2] to [^text1][^text2]
+    """
+    end = _citations_end(text)
+    return BRACKETS_REGEX.sub(_to_footnote, text[:end]) + text[end:]
+
+
+def _element_texts(element) -> list[str]:
+    """Return the texts of a document element that can contain citations."""
+    if isinstance(element, Paragraph | Quote):
+        return [element.text]
+    if isinstance(element, BulletList | OrderedList):
+        return element.items
+    if isinstance(element, Image) and element.caption:
+        return [element.caption]
+    return []
+
+
+class CitationResolver:
+    """Resolve the citations of a document against its references.
+
+    Every text is scanned once for bracketed text, which is looked up in the reference codes, so the work does not
+    grow with the number of references.
+
+    :param references: The references of the document.
+    """
+
+    def __init__(self, references: list[Reference]):
+        self.codes = {ref.code for ref in references}
+        self.ids = reference_ids(references)
+
+    def _code(self, text: str) -> str | None:
+        """Return the reference code cited by the text between brackets, or None.
+
+        A text like `x [R1` comes from an opening bracket without a closing one before a citation: `[x [R1]`.
+        """
+        if text in self.codes:
+            return text
+
+        code = text[text.rfind("[") + 1 :]
+        return code if code in self.codes else None
+
+    def highlight(self, text: str, tag: str = "samp", *, href: str | None = None) -> str:
+        """Wrap the citations of known references in an HTML tag: `[code]` to `<tag>[code]</tag>`.
+
+        :param text: The text to process.
+        :param tag: The HTML tag to use.
+        :param href: The page with the references. If not None, citations link to the reference ids, see `ids`.
+        :returns: The processed text.
+        """
+        if not self.codes:
+            return text
+
+        def replace(match: re.Match) -> str:
+            code = self._code(match.group(1))
+            if code is None:
+                return match.group(0)
+
+            citation = f"<{tag}>[{code}]</{tag}>"
+            if href is not None:
+                citation = f"<a href='{href}#{self.ids[code]}'>{citation}</a>"
+            return match.group(0)[: -len(code) - 2] + citation
+
+        end = _citations_end(text)
+        return BRACKETS_REGEX.sub(replace, text[:end]) + text[end:]
+
+    def check(self, elements: Iterable) -> list[str]:
+        """Return errors for citations without a reference and for references that are never cited.
+
+        :param elements: The elements of the document.
+        :returns: A list of error messages.
+        """
+        cited = set()
+        unresolved = {}
+
+        for element in elements:
+            for text in _element_texts(element):
+                for match in BRACKETS_REGEX.finditer(text, 0, _citations_end(text)):
+                    for code in split_citation(match.group(1)):
+                        if code in self.codes:
+                            cited.add(code)
+                        else:
+                            unresolved.setdefault(code, None)
+
+        errors = [f"Citation without reference: [{code}]" for code in unresolved]
+        errors.extend(f"Reference never cited: [{code}]" for code in sorted(self.codes - cited, key=str.lower))
+
+        return errors
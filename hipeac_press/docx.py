@@ -1,15 +1,17 @@
 import hashlib
 import json
+import pickle
 import re
-from datetime import datetime
+from datetime import UTC, datetime
+from io import BytesIO
 from pathlib import Path
+from typing import IO
 
 from docx import Document as DocxDocument
 from docx.oxml.ns import qn
 
-from .transformers.html import HtmlTransformer
-from .transformers.markdown import MarkdownTransformer
-from .transformers.pdf import PdfTransformer
+from .citations import CitationResolver, parse_reference
+from .transformers import get_transformer
 from .type_definitions import (
     Author,
     BulletList,
@@ -25,6 +27,10 @@ from .type_definitions import (
 from .utils.slug import slugify
 
 
+BOLD_REGEX = re.compile(r"\*\*([^*]+)\*\*")
+BOLD_CHAIN_REGEX = re.compile(r"\*\*[^*]+\*\*(?:\*\*[^*]+\*\*)+")
+
+
 class DocxConverter:
     """A class to convert DOCX files to a structured document format."""
 
@@ -52,6 +58,41 @@ class DocxConverter:
         self.img_folder = self._generate_img_folder(img_folder)
         self.metadata = self._read_metadata(metadata_path)
         self.document = self._create_document(prev=prev, next=next)
+        self.errors.extend(CitationResolver(self.document.references).check(self.document.elements))
+        self._docx = None  # the DOCX tree (with every image blob) is not needed once the document is created
+
+    @classmethod
+    def from_document(
+        cls,
+        docx_path: Path,
+        document: Document,
+        *,
+        errors: list[str] | None = None,
+        img_folder: Path,
+        metadata: dict | None = None,
+        section_name: str = None,
+    ) -> "DocxConverter":
+        """Create a converter from an already converted document, e.g. one returned by a worker process.
+
+        The DOCX file is not opened again, so the converter can export the document but not convert it.
+
+        :param docx_path: Path to the DOCX file.
+        :param document: The converted document.
+        :param errors: The errors found during the conversion.
+        :param img_folder: Directory where the images were saved.
+        :param metadata: The metadata dictionary.
+        :param section_name: The name of the section of the document.
+        :returns: The converter.
+        """
+        converter = cls.__new__(cls)
+        converter._docx_path = docx_path
+        converter._docx = None
+        converter.errors = list(errors or [])
+        converter.section_name = section_name
+        converter.img_folder = img_folder
+        converter.metadata = metadata or {}
+        converter.document = document
+        return converter
 
     def _generate_img_folder(self, base_folder: Path) -> Path:
         """Generate a unique image directory based on the DOCX path.
@@ -136,22 +177,8 @@ class DocxConverter:
         text = re.sub(r"\*\*([^*]+)\*\*\*\*([^*]+)\*\*", r"**\1\2**", text)
         text = re.sub(r"_([^_]+)__([^_]+)_", r"_\1\2_", text)
 
-        # Then handle more complex patterns
-        # Find all bold sections and consolidate them
-        while True:
-            # Look for adjacent bold sections like "**abc****def**"
-            pattern = r"\*\*[^*]+\*\*\*\*[^*]+\*\*"
-            match = re.search(pattern, text)
-            if not match:
-                break
-
-            # Extract the content between ** markers
-            section = match.group(0)
-            content = re.findall(r"\*\*([^*]+)\*\*", section)
-            # Combine the content and wrap in single **
-            combined = f"**{''.join(content)}**"
-            # Replace the original section with the combined version
-            text = text.replace(section, combined)
+        # Then merge every chain of adjacent bold sections like "**abc****def****ghi**" in a single pass
+        text = BOLD_CHAIN_REGEX.sub(lambda match: f"**{''.join(BOLD_REGEX.findall(match.group(0)))}**", text)
 
         # Trim spaces inside formatting markers
         text = re.sub(r"\*\*\s*([^*]+?)\s*\*\*", r"**\1**", text)
@@ -307,9 +334,7 @@ class DocxConverter:
 
         for ref in references:
             try:
-                code = ref.text.split("]")[0][1:]
-                text = ref.text.split("]")[1].strip()
-                refs.append(Reference(code=code, text=text))
+                refs.append(parse_reference(ref.text))
             except Exception as e:
                 self.errors.append(f"Failed to parse reference: {ref.text}, error: {e}")
 
@@ -317,6 +342,14 @@ class DocxConverter:
 
         return elements, refs
 
+    def _get_updated_at(self) -> datetime:
+        """Return when the DOCX was last modified, from its core properties or else the file modification time.
+
+        This keeps the output the same when the document is not changed.
+        """
+        modified = self._docx.core_properties.modified
+        return modified or datetime.fromtimestamp(self._docx_path.stat().st_mtime, tz=UTC)
+
     def _create_document(self, *, prev: NavItem | None = None, next: NavItem | None = None) -> Document:
         """Create a structured document from the DOCX content."""
         elements, references = self._convert_paragraphs()
@@ -325,7 +358,7 @@ class DocxConverter:
             title=self.metadata.get("title", ""),
             authors=[Author(name=author) for author in self.metadata.get("authors", [])],
             keywords=self.metadata.get("keywords", []),
-            updated_at=datetime.now(),
+            updated_at=self._get_updated_at(),
             prev=prev,
             next=next,
             references=references,  # Add references to the document
@@ -333,24 +366,68 @@ class DocxConverter:
         doc.elements.extend(elements)
         return doc
 
+    @property
+    def document(self) -> Document:
+        """Return the structured document, reading it from disk if it was spilled.
+
+        A spilled document is read again on every access, so changes to it are lost: the converter is read-only.
+        """
+        if self._spill_path is not None:
+            with open(self._spill_path, "rb") as f:
+                return pickle.load(f)
+        return self._document
+
+    @document.setter
+    def document(self, document: Document):
+        self._document = document
+        self._spill_path = None
+
+    def spill(self, folder: Path) -> None:
+        """Write the document to disk and release it, to keep memory usage low.
+
+        The document is read again every time it is accessed, so a spilled converter can only be used for exporting:
+        changes to `document` are not written back, and the methods changing it raise a `RuntimeError`. Setting
+        `document` replaces the spilled document.
+
+        :param folder: The folder where the document is written.
+        """
+        if self._spill_path is not None:
+            return
+
+        folder.mkdir(parents=True, exist_ok=True)
+        spill_path = folder / f"{self.slug}.pickle"
+
+        with open(spill_path, "wb") as f:
+            pickle.dump(self._document, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._title = self.title
+        self._document = None
+        self._spill_path = spill_path
+
+    def write(self, stream: IO, format: str = "md", **kwargs) -> None:
+        """Write the structured document to a text or binary stream using the transformer for a format.
+
+        :param stream: The stream to write to, e.g. a file, a zip entry or a `BytesIO`.
+        :param format: The output format, as registered with `register_transformer`.
+        """
+        transformer = get_transformer(format).from_kwargs(self.document, **kwargs)
+        transformer.write(stream, **kwargs)
+
     def export(self, format: str = "md", **kwargs) -> bytes:
         """Export the structured document using the specified transformer.
 
-        :param transformer: The transformer to use for exporting.
-        :returns: The transformed document as a string.
+        :param format: The output format.
+        :returns: The transformed document as bytes.
         """
-        if format == "html":
-            return HtmlTransformer(self.document).get(v=kwargs.get("v", 5))
-        elif format == "md":
-            return MarkdownTransformer(self.document).get()
-        elif format == "pdf":
-            return PdfTransformer(self.document, kwargs.get("build_path")).get(section=kwargs.get("section"))
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        with BytesIO() as buffer:
+            self.write(buffer, format=format, **kwargs)
+            return buffer.getvalue()
 
     @property
     def title(self) -> str:
         """Return the title of the document, or the filename if no title is found."""
+        if self._spill_path is not None:
+            return self._title
         return self.document.title or self._docx_path.stem
 
     @property
@@ -358,18 +435,23 @@ class DocxConverter:
         """Return a slug based on the section name and the title of the document."""
         return f"{slugify(self.section_name or 'n')}--{slugify(self.title)}"
 
+    def _writable_document(self) -> Document:
+        if self._spill_path is not None:
+            raise RuntimeError(f"cannot change `{self.slug}` after it is spilled to disk")
+        return self._document
+
     def add_element(self, element):
         """Add an element to the document."""
-        self.document.elements.append(element)
+        self._writable_document().elements.append(element)
 
     def add_reference(self, reference: Reference):
         """Add a reference to the document."""
-        self.document.references.append(reference)
+        self._writable_document().references.append(reference)
 
     def set_prev(self, prev: NavItem):
         """Set the previous document in the tree."""
-        self.document.prev = prev
+        self._writable_document().prev = prev
 
     def set_next(self, next: NavItem):
         """Set the next document in the tree."""
-        self.document.next = next
+        self._writable_document().next = next
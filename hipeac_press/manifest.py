@@ -0,0 +1,65 @@
+import json
+from dataclasses import asdict
+from pathlib import Path
+
+from .type_definitions import ManifestItem, ManifestSection, NavItem
+
+
+class SiteManifest:
+    """A compact description of the site: sections, documents, navigation, page counts and hashes.
+
+    It is built once from the tree and used instead of the converters (and their DOCX trees) wherever only titles
+    and slugs are needed.
+
+    :param sections: The sections of the site.
+    """
+
+    def __init__(self, sections: list[ManifestSection]):
+        self.sections = sections
+        self._items = {item.slug: item for item in self.items}
+
+    @classmethod
+    def from_tree(cls, tree) -> "SiteManifest":
+        """Create the manifest from a tree of sections and converters, linking all documents in reading order."""
+        sections = [
+            ManifestSection(
+                text=section["text"],
+                collapsed=section.get("collapsed", False),
+                items=[ManifestItem(slug=item.slug, title=item.title) for item in section["items"]],
+            )
+            for section in tree
+        ]
+        items = [item for section in sections for item in section.items]
+
+        for i, item in enumerate(items):
+            if i > 0:
+                item.prev = NavItem(text=items[i - 1].title, link=f"/{items[i - 1].slug}")
+            if i < len(items) - 1:
+                item.next = NavItem(text=items[i + 1].title, link=f"/{items[i + 1].slug}")
+
+        return cls(sections)
+
+    @property
+    def items(self) -> list[ManifestItem]:
+        """Return all documents, in reading order."""
+        return [item for section in self.sections for item in section.items]
+
+    def __getitem__(self, slug: str) -> ManifestItem:
+        return self._items[slug]
+
+    def sidebar(self) -> list[dict]:
+        """Return the sidebar structure used by Vitepress, with a link to the PDF of each section if there is one."""
+        sidebar = []
+
+        for section in self.sections:
+            items = [{"text": item.title, "link": item.slug} for item in section.items]
+            if section.pdf:
+                items.append({"text": "Download PDF", "link": f"/pdf/{section.pdf}", "target": "_blank"})
+            sidebar.append({"text": section.text, "collapsed": section.collapsed, "items": items})
+
+        return sidebar
+
+    def write(self, path: Path) -> None:
+        """Write the manifest to a JSON file."""
+        with open(path, "w") as f:
+            json.dump([asdict(section) for section in self.sections], f, indent=2)
@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from xml.etree import ElementTree
+
+from .citations import CitationResolver, parse_reference
+from .reader import Reader
+from .type_definitions import Paragraph
+from .utils.processes import process_context
+from .utils.sync import write_errors
+
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DC_TITLE = "{http://purl.org/dc/elements/1.1/}title"
+NESTING_TAGS = {f"{W}tbl", f"{W}txbxContent"}
+UNSUPPORTED_IMAGES = [".emf", ".wmf"]
+
+
+def _paragraphs(zip_file: zipfile.ZipFile) -> Iterator[tuple[str, str]]:
+    """Yield the style and text of every paragraph of the document body, parsing the XML incrementally.
+
+    Like `python-docx`, paragraphs in tables and text boxes are skipped.
+    """
+    nested = 0
+
+    with zip_file.open("word/document.xml") as f:
+        for event, element in ElementTree.iterparse(f, events=("start", "end")):
+            if element.tag in NESTING_TAGS:
+                nested += 1 if event == "start" else -1
+                if event == "end":
+                    element.clear()
+            elif event == "end" and element.tag == f"{W}p" and not nested:
+                style = element.find(f"{W}pPr/{W}pStyle")
+                text = "".join(t.text or "" for t in element.iter(f"{W}t"))
+                yield (style.get(f"{W}val") if style is not None else ""), text
+                element.clear()
+
+
+def _title(zip_file: zipfile.ZipFile, metadata_path: Path) -> str | None:
+    """Return the title of a document, from `metadata.json` or else from the DOCX core properties."""
+    if metadata_path.exists():
+        with open(metadata_path) as f:
+            title = json.load(f).get("title")
+            if title:
+                return title
+
+    try:
+        with zip_file.open("docProps/core.xml") as f:
+            return ElementTree.parse(f).getroot().findtext(DC_TITLE)
+    except KeyError:
+        return None
+
+
+def check_docx(docx_path: Path, metadata_path: Path) -> list[str]:
+    """Check a DOCX file for the problems that otherwise show up only after the conversion and the PDF rendering.
+
+    Only the zip directory, the core properties and the document body are read, without building a DOCX tree.
+    Messages are the same as the ones of `DocxConverter`, but the raw text of the paragraphs is checked: e.g. captions
+    are included, so the problems are warnings and may differ from the errors of the conversion.
+
+    :param docx_path: Path to the DOCX file.
+    :param metadata_path: Path to the metadata JSON file.
+    :returns: A list of error messages.
+    """
+    errors = []
+
+    try:
+        zip_file = zipfile.ZipFile(docx_path)
+    except (zipfile.BadZipFile, OSError) as e:
+        return [f"Not a valid DOCX file: {e}"]
+
+    with zip_file:
+        for name in zip_file.namelist():
+            for ext in UNSUPPORTED_IMAGES:
+                if name.startswith("word/media/") and name.lower().endswith(ext):
+                    errors.append(f"{ext} image format not supported: {Path(name).name}")
+
+        try:
+            if not _title(zip_file, metadata_path):
+                errors.append("Missing title: set it in metadata.json or in the document properties")
+        except (json.JSONDecodeError, ElementTree.ParseError) as e:
+            errors.append(f"Failed to read the title: {e}")
+
+        texts = []
+        references = []
+        in_references_section = False
+
+        try:
+            for style, text in _paragraphs(zip_file):
+                if text.strip().lower() == "references":
+                    in_references_section = True
+                elif in_references_section:
+                    if text.strip():
+                        try:
+                            references.append(parse_reference(text.strip()))
+                        except Exception as e:
+                            errors.append(f"Failed to parse reference: {text.strip()}, error: {e}")
+                elif not style.startswith("Heading"):
+                    texts.append(Paragraph(text=text))
+        except (KeyError, ElementTree.ParseError) as e:
+            errors.append(f"Failed to read the document body: {e}")
+
+    errors.extend(CitationResolver(references).check(texts))
+    return errors
+
+
+def _check_job(job: tuple[Path, Path]) -> list[str]:
+    return check_docx(*job)
+
+
+def preflight(main_folder: Path, *, workers: int = 1) -> dict[Path, list[str]]:
+    """Check every DOCX file of the tree in parallel.
+
+    :param main_folder: The folder with one subfolder per section.
+    :param workers: Number of processes used to check the files.
+    :returns: The errors of every DOCX file, by path.
+    """
+    jobs = Reader(main_folder, img_folder=None).documents()
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = map(_check_job, jobs)
+        return {docx_path: errors for (docx_path, _), errors in zip(jobs, results, strict=True)}
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=process_context()) as executor:
+        results = executor.map(_check_job, jobs, chunksize=4)
+        return {docx_path: errors for (docx_path, _), errors in zip(jobs, results, strict=True)}
+
+
+def preflight_report(results: dict[Path, list[str]], main_folder: Path) -> str:
+    """Return a report of the problems found, one file per line followed by its errors."""
+    lines = []
+
+    for docx_path, errors in results.items():
+        if errors:
+            lines.append(str(docx_path.relative_to(main_folder)))
+            lines.extend(f"  {error}" for error in errors)
+
+    count = sum(len(errors) for errors in results.values())
+    return "\n".join([f"Preflight: {count} problems in {len(results)} documents", *lines])
+
+
+if __name__ == "__main__":
+    # Check the Vision folder before building, writing the problems to the errors.txt files and exiting with 1 if
+    # there are any. With `--warn`, the problems are only printed:
+    # python -m hipeac_press.preflight [--warn]
+    source = Path(os.environ["VISION_SOURCE_PATH"])
+    results = preflight(source, workers=os.cpu_count() or 1)
+    print(preflight_report(results, source))
+
+    if "--warn" not in sys.argv:
+        folders = {}
+
+        for docx_path, errors in results.items():
+            folders.setdefault(docx_path.parent, []).extend(errors)
+
+        for folder, errors in folders.items():
+            write_errors(errors, folder / "errors.txt")
+
+        sys.exit(1 if any(results.values()) else 0)
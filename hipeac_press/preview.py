@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from .docx import DocxConverter
+from .transformers import get_transformer
+from .transformers.html import HtmlTransformer
+
+
+CONTENT_TYPES = {"html": "text/html; charset=utf-8", "pdf": "application/pdf"}
+MAX_UPLOAD_SIZE = 100 * 2**20
+
+
+class PreviewCache:
+    """An in-memory LRU cache of rendered previews, bounded by the total size of the cached outputs.
+
+    :param max_size: The maximum number of bytes kept in memory.
+    """
+
+    def __init__(self, max_size: int = 256 * 2**20):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, str], tuple[bytes, list[str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str]) -> tuple[bytes, list[str]] | None:
+        """Return a cached preview and mark it as the most recently used, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: tuple[str, str], value: tuple[bytes, list[str]]) -> None:
+        """Cache a preview, evicting the least recently used ones while the cache is over its size."""
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key)[0])
+
+            self._entries[key] = value
+            self.size += len(value[0])
+
+            while self.size > self.max_size and len(self._entries) > 1:
+                _, (content, _) = self._entries.popitem(last=False)
+                self.size -= len(content)
+
+
+class PreviewService:
+    """Convert DOCX files and render them as HTML or PDF, keeping the renderers warm between requests.
+
+    The PDF transformer is imported and its stylesheet parsed once, when the service starts. Outputs are cached by
+    the hash of the DOCX file (and its metadata), so an unchanged document is served from memory. Conversions and
+    renderings run one at a time; cached previews are served while another document is rendered.
+
+    :param work_path: The folder for uploaded files, images and the PDF cache.
+    :param max_size: The maximum number of bytes of previews kept in memory.
+    :param profile: The PDF render profile, `draft` or `final`.
+    """
+
+    def __init__(self, work_path: Path, *, max_size: int = 256 * 2**20, profile: str = "final"):
+        self.work_path = work_path
+        self.profile = profile
+        self.cache = PreviewCache(max_size)
+        self._render_lock = threading.Lock()
+
+        (self.work_path / "uploads").mkdir(parents=True, exist_ok=True)
+        (self.work_path / "images").mkdir(parents=True, exist_ok=True)
+
+    def warm_up(self) -> None:
+        """Import WeasyPrint and set up the fonts and stylesheet of the PDF template."""
+        from .transformers.pdf import _pdf_template
+
+        get_transformer("pdf")
+        _pdf_template()
+
+    def _convert(self, docx_path: Path, metadata_path: Path | None) -> DocxConverter:
+        return DocxConverter(docx_path, img_folder=self.work_path / "images", metadata_path=metadata_path)
+
+    def _render(self, converter: DocxConverter, format: str) -> bytes:
+        if format == "html":
+            return HtmlTransformer(converter.document).get_html(with_hints=False).encode("utf-8")
+
+        return converter.export(
+            format="pdf", build_path=self.work_path, cache_path=self.work_path / "pdf", profile=self.profile
+        )
+
+    def preview(self, docx_path: Path, format: str = "html") -> tuple[bytes, list[str]]:
+        """Return the preview of a DOCX file, with the errors found while converting it.
+
+        :param docx_path: Path to the DOCX file. The `metadata.json` file of its folder is used if it exists.
+        :param format: The output format, `html` or `pdf`.
+        :returns: The rendered document and the list of errors.
+        """
+        if format not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported format: {format}")
+
+        metadata_path = docx_path.parent / "metadata.json"
+        hash_object = hashlib.sha256(docx_path.read_bytes())
+        if metadata_path.exists():
+            hash_object.update(metadata_path.read_bytes())
+        else:
+            metadata_path = None
+
+        key = (hash_object.hexdigest(), format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._render_lock:
+            cached = self.cache.get(key)  # rendered by another request while waiting
+            if cached is None:
+                converter = self._convert(docx_path, metadata_path)
+                cached = (self._render(converter, format), list(converter.errors))
+                self.cache.set(key, cached)
+
+        return cached
+
+    def preview_upload(self, content: bytes, format: str = "html") -> tuple[bytes, list[str]]:
+        """Return the preview of an uploaded DOCX file, saved in the work folder under its content hash.
+
+        :param content: The DOCX file.
+        :param format: The output format, `html` or `pdf`.
+        :returns: The rendered document and the list of errors.
+        """
+        upload_path = self.work_path / "uploads" / f"{hashlib.sha256(content).hexdigest()}.docx"
+
+        if not upload_path.exists():
+            tmp_path = upload_path.with_name(f".{upload_path.name}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, upload_path)
+
+        return self.preview(upload_path, format)
+
+
+class PreviewRequestHandler(SimpleHTTPRequestHandler):
+    """Serve previews and the images they reference.
+
+    - `GET /html?path=...` and `GET /pdf?path=...` render a DOCX file of the local disk.
+    - `POST /html` and `POST /pdf` render the DOCX file sent as the request body.
+    - `GET /images/...` serves the images of the converted documents.
+
+    The conversion errors are sent in the `X-Preview-Errors` header, as a JSON list.
+    """
+
+    service: PreviewService
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(self.service.work_path), **kwargs)
+
+    def _send_preview(self, format: str, render) -> None:
+        start = time.perf_counter()
+
+        try:
+            content, errors = render()
+        except FileNotFoundError as e:
+            self.send_error(HTTPStatus.NOT_FOUND, str(e))
+            return
+        except Exception as e:
+            self.send_error(HTTPStatus.UNPROCESSABLE_ENTITY, f"Preview failed: {e}")
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPES[format])
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("X-Preview-Errors", json.dumps(errors))
+        self.send_header("Server-Timing", f"render;dur={(time.perf_counter() - start) * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        """Render a DOCX file of the local disk, or serve an image."""
+        url = urllib.parse.urlsplit(self.path)
+        format = url.path.strip("/")
+
+        if format in CONTENT_TYPES:
+            query = urllib.parse.parse_qs(url.query)
+            if "path" not in query:
+                self.send_error(HTTPStatus.BAD_REQUEST, "Missing path parameter")
+                return
+            self._send_preview(format, lambda: self.service.preview(Path(query["path"][0]), format))
+        elif url.path.startswith("/images/"):
+            super().do_GET()
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_POST(self):
+        """Render the uploaded DOCX file."""
+        format = urllib.parse.urlsplit(self.path).path.strip("/")
+        length = int(self.headers.get("Content-Length", 0))
+
+        if format not in CONTENT_TYPES:
+            self.send_error(HTTPStatus.NOT_FOUND)
+        elif not 0 < length <= MAX_UPLOAD_SIZE:
+            self.send_error(HTTPStatus.BAD_REQUEST, "Send the DOCX file as the request body")
+        else:
+            content = self.rfile.read(length)
+            self._send_preview(format, lambda: self.service.preview_upload(content, format))
+
+
+def run_preview_server(
+    work_path: Path, *, port: int = 8765, max_size: int = 256 * 2**20, profile: str = "final"
+) -> ThreadingHTTPServer:
+    """Create the preview service and an HTTP server for it, listening on localhost.
+
+    :param work_path: The folder for uploaded files, images and the PDF cache.
+    :param port: The port to listen on.
+    :param max_size: The maximum number of bytes of previews kept in memory.
+    :param profile: The PDF render profile, `draft` or `final`.
+    :returns: The server; call `serve_forever` to start it.
+    """
+    service = PreviewService(work_path, max_size=max_size, profile=profile)
+    service.warm_up()
+    handler = type("Handler", (PreviewRequestHandler,), {"service": service})
+    return ThreadingHTTPServer(("127.0.0.1", port), handler)
+
+
+if __name__ == "__main__":
+    # Run the preview service for editors:
+    # python -m hipeac_press.preview [port]
+    # curl "http://localhost:8765/pdf?path=/path/to/article.docx" -o preview.pdf
+    # curl --data-binary @article.docx http://localhost:8765/html
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    work_path = Path(os.environ.get("PREVIEW_PATH", Path.cwd() / ".cache" / "preview"))
+    httpd = run_preview_server(
+        work_path,
+        port=port,
+        max_size=int(os.environ.get("PREVIEW_CACHE_SIZE", 256)) * 2**20,
+        profile=os.environ.get("PREVIEW_PROFILE", "final"),
+    )
+    print(f"Preview service running on http://localhost:{port}")
+
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        httpd.server_close()
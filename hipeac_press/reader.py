@@ -1,72 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from hipeac_press.docx import DocxConverter
+from hipeac_press.manifest import SiteManifest
+from hipeac_press.utils.processes import process_context
+
+
+def _convert_docx(docx_path: Path, img_folder: Path, metadata_path: Path, section_name: str):
+    """Convert a DOCX file and return the picklable parts of the converter.
+
+    This runs in a worker process, so only the document, errors and metadata are sent back.
+    """
+    converter = DocxConverter(docx_path, img_folder=img_folder, metadata_path=metadata_path, section_name=section_name)
+    return converter.document, converter.errors, converter.img_folder, converter.metadata
 
 
 class Reader:
-    """A class to represent a reader of a folder structure."""
+    """A class to represent a reader of a folder structure.
+
+    :param main_folder: The folder with one subfolder per section.
+    :param img_folder: Directory to save images.
+    :param workers: Number of processes used to convert DOCX files. Files are converted serially if 1.
+    """
 
-    def __init__(self, main_folder: Path, img_folder: Path):
+    def __init__(self, main_folder: Path, img_folder: Path, *, workers: int = 1):
         self.main_folder = main_folder
         self.img_folder = img_folder
+        self.workers = workers
+        self.manifest = None
         self.main_folders = [
             folder for folder in sorted(self.main_folder.iterdir()) if folder.is_dir() and folder.name[0] != "."
         ]
 
-    def _read_folder(self, folder: Path, section_name: str = None):
-        items = []
+    def _find_docx(self, folder: Path) -> list[tuple[Path, Path]]:
+        """Return the DOCX files in a folder and its subfolders, with their metadata paths, in sorted order."""
+        files = []
 
         for content in sorted(folder.iterdir()):
             if content.is_dir():
                 if content.name == "tracked":
                     continue
-                items.extend(self._read_folder(content, section_name))
+                files.extend(self._find_docx(content))
             elif content.is_file() and content.suffix == ".docx" and content.name[0] != "~":
-                items.append(
-                    DocxConverter(
-                        content,
-                        img_folder=self.img_folder,
-                        metadata_path=folder / "metadata.json",
-                        section_name=section_name,
-                    )
-                )
+                files.append((content, folder / "metadata.json"))
+
+        return files
 
-        return items
+    def documents(self) -> list[tuple[Path, Path]]:
+        """Return every DOCX file of the tree with its metadata path, in reading order."""
+        return [file for main_folder in self.main_folders for file in self._find_docx(main_folder)]
+
+    def _convert(self, jobs: list[tuple[Path, Path, str]]) -> list[DocxConverter]:
+        """Convert a list of `(docx_path, metadata_path, section_name)` jobs, keeping their order."""
+        if self.workers <= 1 or len(jobs) <= 1:
+            return [
+                DocxConverter(docx_path, img_folder=self.img_folder, metadata_path=metadata_path, section_name=name)
+                for docx_path, metadata_path, name in jobs
+            ]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)), mp_context=process_context()) as executor:
+            results = executor.map(
+                _convert_docx,
+                [docx_path for docx_path, _, _ in jobs],
+                [self.img_folder] * len(jobs),
+                [metadata_path for _, metadata_path, _ in jobs],
+                [name for _, _, name in jobs],
+            )
+
+            return [
+                DocxConverter.from_document(
+                    docx_path, document, errors=errors, img_folder=img_folder, metadata=metadata, section_name=name
+                )
+                for (docx_path, _, name), (document, errors, img_folder, metadata) in zip(jobs, results, strict=True)
+            ]
 
     def _set_navigation(self, tree):
         all_items = [item for section in tree for item in section["items"]]
 
-        for i, item in enumerate(all_items):
-            if i > 0:
-                item.set_prev(
-                    {
-                        "text": all_items[i - 1].title,
-                        "link": f"/{all_items[i - 1].slug}",
-                    }
-                )
-            if i < len(all_items) - 1:
-                item.set_next(
-                    {
-                        "text": all_items[i + 1].title,
-                        "link": f"/{all_items[i + 1].slug}",
-                    }
-                )
+        for item, entry in zip(all_items, self.manifest.items, strict=True):
+            item.set_prev(entry.prev)
+            item.set_next(entry.next)
 
     def build_tree(self):
-        """Build the tree structure and set navigation."""
+        """Build the tree structure and the site manifest, and set navigation.
+
+        All DOCX files of all sections are converted in one batch, so a process pool can be shared between sections.
+        """
         tree = []
+        jobs = []
+        counts = []
 
         for main_folder in self.main_folders:
             section_name = main_folder.name[3:].strip()
-            items = self._read_folder(main_folder, section_name)
+            files = self._find_docx(main_folder)
+            jobs.extend((docx_path, metadata_path, section_name) for docx_path, metadata_path in files)
+            counts.append(len(files))
             tree.append(
                 {
                     "text": section_name,
                     "collapsed": main_folder.name.split(" ")[0].endswith("C"),
-                    "items": items,
+                    "items": [],
                 }
             )
 
+        items = iter(self._convert(jobs))
+        for section, count in zip(tree, counts, strict=True):
+            section["items"] = [next(items) for _ in range(count)]
+
+        self.manifest = SiteManifest.from_tree(tree)
         self._set_navigation(tree)
 
         return tree
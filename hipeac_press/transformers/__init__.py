@@ -1,7 +1,64 @@
+from importlib import import_module
+from importlib.metadata import entry_points
+
+from .base import Transformer
 from .markdown import MarkdownTransformer
 
 
-# from .pdf import PdfTransformer
+ENTRY_POINT_GROUP = "hipeac_press.transformers"
+
+# Transformers are registered as "module:ClassName" strings and only imported when their format is requested,
+# so markdown-only tooling does not pay for the WeasyPrint import.
+_registry: dict[str, str | type[Transformer]] = {
+    "html": "hipeac_press.transformers.html:HtmlTransformer",
+    "md": "hipeac_press.transformers.markdown:MarkdownTransformer",
+    "pdf": "hipeac_press.transformers.pdf:PdfTransformer",
+}
+_entry_points_loaded = False
+
+
+def _load_entry_points() -> None:
+    """Register the transformers declared by installed packages in the `hipeac_press.transformers` group."""
+    global _entry_points_loaded
+
+    if _entry_points_loaded:
+        return
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _registry.setdefault(entry_point.name, entry_point.value)
+
+    _entry_points_loaded = True
+
+
+def register_transformer(format: str, transformer: type[Transformer] | str) -> None:
+    """Register a transformer for an output format.
+
+    :param format: The output format, e.g. `md`.
+    :param transformer: The transformer class, or a `module:ClassName` string to import it lazily.
+    """
+    _registry[format] = transformer
+
+
+def get_transformer(format: str) -> type[Transformer]:
+    """Return the transformer class for an output format, importing it if needed.
+
+    :param format: The output format, e.g. `md`.
+    :returns: The transformer class.
+    """
+    if format not in _registry:
+        _load_entry_points()
+
+    if format not in _registry:
+        raise ValueError(f"Unsupported format: {format}")
+
+    transformer = _registry[format]
+
+    if isinstance(transformer, str):
+        module_name, _, class_name = transformer.partition(":")
+        transformer = getattr(import_module(module_name), class_name)
+        _registry[format] = transformer
+
+    return transformer
 
 
-__all__ = ["MarkdownTransformer"]
+__all__ = ["MarkdownTransformer", "Transformer", "get_transformer", "register_transformer"]
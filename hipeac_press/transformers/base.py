@@ -1,10 +1,27 @@
 """Base transformer class for the hipeac_press package."""
 
+import io
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from typing import IO
 
 from ..type_definitions import Document
 
 
+def write_chunks(stream: IO, chunks: Iterable[str]) -> None:
+    """Write text chunks to a text or binary stream, encoding them as UTF-8 if the stream is binary.
+
+    :param stream: The stream to write to, e.g. a file, a zip entry or a `BytesIO`.
+    :param chunks: The text chunks to write.
+    """
+    if isinstance(stream, io.TextIOBase):
+        for chunk in chunks:
+            stream.write(chunk)
+    else:
+        for chunk in chunks:
+            stream.write(chunk.encode("utf-8"))
+
+
 class Transformer(ABC):
     """Abstract base class for transformers.
 
@@ -18,10 +35,28 @@ class Transformer(ABC):
         """
         self.document = document
 
+    @classmethod
+    def from_kwargs(cls, document: Document, **kwargs) -> "Transformer":
+        """Create the transformer from the keyword arguments given to `DocxConverter.export`.
+
+        :param document: The document to transform.
+        :returns: The transformer.
+        """
+        return cls(document)
+
     @abstractmethod
-    def get(self) -> bytes:
+    def write(self, stream: IO, **kwargs) -> None:
+        """Write the transformed document to a stream.
+
+        :param stream: The stream to write to.
+        """
+        raise NotImplementedError
+
+    def get(self, **kwargs) -> bytes:
         """Return the transformed document as a byte string.
 
         :returns: The transformed document as a byte string.
         """
-        raise NotImplementedError
+        with io.BytesIO() as buffer:
+            self.write(buffer, **kwargs)
+            return buffer.getvalue()
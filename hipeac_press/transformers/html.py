@@ -1,25 +1,26 @@
 import re
+from collections.abc import Iterator
 from pathlib import Path
+from typing import IO
 
 import markdown2
 
+from ..citations import CitationResolver
 from ..type_definitions import Image
+from .base import write_chunks
 from .markdown import MarkdownTransformer, process_text
 
 
+URL_REGEX = re.compile(r"(https?://\S+)")
+
+
 def _process_urls(text) -> str:
     """Process URLs in text. Detect urls and make them clickable.
 
     :param text: The text to process.
     :return: The text with links processed.
     """
-    url_regex = r"(https?://\S+)"
-    urls = re.findall(url_regex, text)
-
-    for url in urls:
-        text = text.replace(url, f"<a href='{url}'>{url}</a>")
-
-    return text
+    return URL_REGEX.sub(lambda match: f"<a href='{match.group(1)}'>{match.group(1)}</a>", text)
 
 
 class HtmlTransformer(MarkdownTransformer):
@@ -44,40 +45,59 @@ class HtmlTransformer(MarkdownTransformer):
         md = self.to_markdown(element)
         return markdown2.markdown(md)
 
-    def get_html(self, v: int = 5) -> str:
-        """Return the HTML representation of a Document object.
-
-        :return: The HTML representation of the document as a string.
+    @staticmethod
+    def _hints_to_html(document) -> str:
+        return "".join(f"<link rel='prefetch' href='{hint.href}' as='{hint.type}' />\n" for hint in document.prefetch)
+
+    def chunks(
+        self,
+        v: int = 5,
+        *,
+        with_hints: bool = True,
+        with_references: bool = True,
+        link_citations: str | None = None,
+    ) -> Iterator[str]:
+        """Yield the HTML representation of a Document object, one element at a time.
+
+        :param v: The HTML version. Version 4 is used for EPUB readers.
+        :param with_hints: Whether to start with the prefetch hints for the next document.
+        :param with_references: Whether to end with the references.
+        :param link_citations: The page with the references, if citations should link to them, e.g. when a document
+            is split into several files. References get an id as link target.
         """
-        html = ""
         samp = "samp" if v == 5 else "strong"
+        citations = CitationResolver(self.document.references)
+
+        if with_hints and self.document.prefetch:
+            yield self._hints_to_html(self.document)
 
         for element in self.document.elements:
             if isinstance(element, Image):
-                html += self._image_to_html(element, v) + "\n"
+                html = self._image_to_html(element, v) + "\n"
             else:
-                html += self.to_html(element) + "\n"
+                html = self.to_html(element) + "\n"
 
-        if self.document.references:
-            for ref in self.document.references:
-                html = html.replace(f"[{ref.code}]", f"<{samp}>[{ref.code}]</{samp}>")
+            yield citations.highlight(html, samp, href=link_citations)
 
-        if self.document.references:
-            html += "<div class='references-block'>" + "\n"
-            html += "<h2 class='title'>References</h2>\n"
-            html += "<ul class='references'>\n"
+        if with_references and self.document.references:
+            yield "<div class='references-block'>" + "\n"
+            yield "<h2 class='title'>References</h2>\n"
+            yield "<ul class='references'>\n"
 
             for ref in self.document.references:
-                html += f"<li><{samp}>{ref.code}:</{samp}> {_process_urls(ref.text)}</li>\n"
+                li = "<li>" if link_citations is None else f"<li id='{citations.ids[ref.code]}'>"
+                yield f"{li}<{samp}>{ref.code}:</{samp}> {_process_urls(ref.text)}</li>\n"
 
-            html += "</ul>\n"
-            html += "</div>\n"
+            yield "</ul>\n"
+            yield "</div>\n"
 
-        return html
+    def get_html(self, v: int = 5, **kwargs) -> str:
+        """Return the HTML representation of a Document object. Keyword arguments are the ones of `chunks`.
 
-    def get(self, v: int = 5) -> bytes:
-        """Return the HTML representation of a Document object.
-
-        :return: The HTML representation of the document as bytes.
+        :return: The HTML representation of the document as a string.
         """
-        return self.get_html(v).encode("utf-8")
+        return "".join(self.chunks(v, **kwargs))
+
+    def write(self, stream: IO, *, v: int = 5, with_hints: bool = True, **kwargs) -> None:
+        """Write the HTML representation of a Document object to a text or binary stream."""
+        write_chunks(stream, self.chunks(v, with_hints=with_hints))
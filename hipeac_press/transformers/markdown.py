@@ -1,32 +1,13 @@
 """Markdown transformer for the hipeac_press package."""
 
 import re
+from collections.abc import Iterator
 from pathlib import Path
+from typing import IO
 
+from ..citations import to_footnotes
 from ..type_definitions import BulletList, Header, Image, OrderedList, Paragraph, Quote, Table
-from .base import Transformer
-
-
-def _process_footnotes(text: str) -> str:
-    """Convert references to footnotes.
-
-    Converts:
-    - [number] to [^number]
-    - [text] to [^text]
-    - [text1, text2] to [^text1][^text2]
-    """
-    # First pass: handle comma-separated references
-    text = re.sub(
-        r"\[([^\]]+(?:,\s*[^\]]+)+)\]", lambda m: "".join(f"[^{r.strip()}]" for r in m.group(1).split(",")), text
-    )
-
-    # Second pass: convert single numbered references
-    text = re.sub(r"\[(\d+)\]", r"[^\1]", text)
-
-    # Third pass: convert remaining single text references (but not image alt text)
-    text = re.sub(r"\[([^\]^!][^\]]*)\]", r"[^\1]", text)
-
-    return text
+from .base import Transformer, write_chunks
 
 
 def _process_co2(text: str) -> str:
@@ -77,6 +58,11 @@ class MarkdownTransformer(Transformer):
             if document.next
             else "next: false\n"
         )
+        # images are renamed by Vite when bundled, so only documents can be prefetched from the Vitepress site
+        hints = [hint for hint in document.prefetch if hint.type == "document"]
+        if hints:
+            md += "head:\n"
+            md += "".join(f"  - - link\n    - rel: prefetch\n      href: {hint.href}\n" for hint in hints)
         md += "---\n\n\n"
 
         return md
@@ -143,34 +129,32 @@ class MarkdownTransformer(Transformer):
 
         return ""
 
-    def get(
+    def chunks(
         self,
         *,
         with_badges: bool = True,
         with_frontmatter: bool = True,
-    ) -> bytes:
-        """Return the markdown representation of a Document object."""
-        md = ""
-
+    ) -> Iterator[str]:
+        """Yield the markdown representation of a Document object, one element at a time."""
         if with_frontmatter:
-            md += self._frontmatter(self.document)
+            yield self._frontmatter(self.document)
 
         if with_badges:
-            md += self._badges(self.document)
+            yield self._badges(self.document)
 
         # Convert main content
         for element in self.document.elements:
-            md += self.to_markdown(element) + "\n"
-
-        md = _process_footnotes(md)
+            yield to_footnotes(self.to_markdown(element) + "\n")
 
         # Add references as footnotes if they exist
         if self.document.references:
-            md += "\n## References\n\n"
+            yield "\n## References\n\n"
 
             for ref in self.document.references:
-                md += f"[^{ref.code}]: {process_text(ref.text)}\n"
+                yield f"[^{ref.code}]: {process_text(ref.text)}\n"
 
-            md += "\n"
+            yield "\n"
 
-        return md.encode("utf-8")
+    def write(self, stream: IO, *, with_badges: bool = True, with_frontmatter: bool = True, **kwargs) -> None:
+        """Write the markdown representation of a Document object to a text or binary stream."""
+        write_chunks(stream, self.chunks(with_badges=with_badges, with_frontmatter=with_frontmatter))
@@ -1,43 +1,196 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from functools import cache
 from pathlib import Path
+from typing import IO
 
+import weasyprint
 from weasyprint import CSS, HTML
 from weasyprint.text.fonts import FontConfiguration
 
-from ..type_definitions import Document
+from ..type_definitions import Document, Image
 from .html import HtmlTransformer
 
 
 CURRENT_PATH = Path(__file__).parent
 
+# WeasyPrint options of each render profile. Both use the same stylesheet: drafts are for review and downsample the
+# images without optimizing them, final PDFs keep full-resolution images and optimize them for print.
+RENDER_PROFILES = {
+    "draft": {"dpi": 96, "jpeg_quality": 60},
+    "final": {"optimize_images": True},
+}
+
+# the PDF cache is pruned to this size after every rendering, removing the least recently used PDFs first
+PDF_CACHE_MAX_SIZE = 2**30
+
+
+@cache
+def _template_hash() -> str:
+    """Return a hash of the WeasyPrint version and the files of the PDF template (stylesheet and fonts)."""
+    hash_object = hashlib.sha256(weasyprint.__version__.encode())
+
+    for file in sorted((CURRENT_PATH / "pdf").rglob("*")):
+        if file.is_file():
+            hash_object.update(str(file.relative_to(CURRENT_PATH)).encode())
+            hash_object.update(file.read_bytes())
+
+    return hash_object.hexdigest()
+
+
+def prune_pdf_cache(cache_path: Path, max_size: int = PDF_CACHE_MAX_SIZE) -> None:
+    """Remove the least recently used PDFs of a cache folder until it is not larger than `max_size`.
+
+    Reading a cached PDF updates its modification time, so the modification time tells when a PDF was last used.
+    Temporary files older than a day, left by renderings killed by the watchdog, are removed too.
+
+    :param cache_path: The folder with the cached PDFs.
+    :param max_size: The maximum size of the folder, in bytes.
+    """
+    files = []
+
+    for file in cache_path.glob("*"):
+        try:
+            stat = file.stat()
+        except FileNotFoundError:  # removed by another process
+            continue
+
+        if file.suffix == ".pdf":
+            files.append((stat, file))
+        elif file.suffix == ".tmp" and stat.st_mtime < time.time() - 86400:
+            file.unlink(missing_ok=True)
+
+    size = sum(stat.st_size for stat, _ in files)
+
+    for stat, file in sorted(files, key=lambda entry: entry[0].st_mtime_ns):
+        if size <= max_size:
+            break
+        file.unlink(missing_ok=True)
+        size -= stat.st_size
+
+
+@cache
+def _pdf_template() -> tuple[FontConfiguration, list[CSS]]:
+    """Return the font configuration and the parsed stylesheets, set up once per process.
+
+    Parsing the stylesheet and registering its fonts costs more than rendering a short document, so long-running
+    processes (e.g. the preview service) reuse them for every rendering.
+    """
+    font_config = FontConfiguration()
+    return font_config, [CSS(filename=CURRENT_PATH / "pdf" / "pdf.css", font_config=font_config)]
+
 
 class PdfTransformer(HtmlTransformer):
     """A transformer that converts a Document object into a PDF starting from a HTML."""
 
-    def __init__(self, document: Document, image_path: Path):
+    def __init__(self, document: Document, image_path: Path, *, cache_path: Path | None = None, profile: str = "final"):
         """Initialize the transformer with a document.
 
         :param document: The document to transform.
         :param image_path: The path to the images.
+        :param cache_path: The folder where rendered PDFs are cached. PDFs are not cached if None.
+        :param profile: The render profile, `draft` or `final`.
         """
+        if profile not in RENDER_PROFILES:
+            raise ValueError(f"Unsupported render profile: {profile}")
+
         self.document = document
         self.image_path = image_path
+        self.cache_path = cache_path
+        self.profile = profile
+
+    @classmethod
+    def from_kwargs(cls, document: Document, **kwargs) -> "PdfTransformer":
+        """Create the transformer, using `build_path` as the path to the images."""
+        return cls(
+            document,
+            kwargs.get("build_path"),
+            cache_path=kwargs.get("cache_path"),
+            profile=kwargs.get("profile", "final"),
+        )
 
     def _setup_pdf_template(self):
         """Set up the PDF template."""
-        self.font_config = FontConfiguration()
-        self.stylesheets = [
-            CSS(filename=CURRENT_PATH / "pdf" / "pdf.css", font_config=self.font_config),
-        ]
+        self.font_config, self.stylesheets = _pdf_template()
+
+    def _cache_key(self, html: str) -> str:
+        """Return the cache key of a rendered PDF.
 
-    def get(self, section: str | None) -> bytes:
-        """Return the PDF representation of a Document object.
+        The key covers everything that changes the output: the HTML, the PDF template and the referenced images.
 
-        :return: The PDF representation of the document as bytes.
+        :param html: The HTML that will be rendered.
+        :returns: The cache key.
         """
-        self._setup_pdf_template()
+        hash_object = hashlib.sha256(_template_hash().encode())
+        hash_object.update(repr(sorted(self._render_options().items())).encode())
+        hash_object.update(html.encode("utf-8"))
+
+        for element in self.document.elements:
+            if isinstance(element, Image):
+                try:
+                    hash_object.update(Path(element.path).read_bytes())
+                except FileNotFoundError:
+                    hash_object.update(b"missing")
+
+        return hash_object.hexdigest()
+
+    def fingerprint(self) -> str:
+        """Return the cache key of the PDF of the document, which changes with everything the PDF depends on."""
+        return self._cache_key(self.get_html(with_hints=False))
+
+    def _render_options(self) -> dict:
+        """Return the WeasyPrint options of the render profile.
+
+        The file identifier is derived from the slug, so output is reproducible.
+        """
+        return {
+            **RENDER_PROFILES[self.profile],
+            "pdf_identifier": hashlib.md5(self.document.slug.encode()).hexdigest().encode(),
+        }
 
-        html = self.get_html()
+    def _render(self, html: str, target) -> None:
+        """Render HTML as PDF into a binary stream or a file path."""
+        self._setup_pdf_template()
         pdf_writer = HTML(string=html, base_url=self.image_path)
-        pdf = pdf_writer.write_pdf(stylesheets=self.stylesheets, font_config=self.font_config)
+        pdf_writer.write_pdf(
+            target, stylesheets=self.stylesheets, font_config=self.font_config, **self._render_options()
+        )
+
+    def write(self, stream: IO, *, section: str | None = None, **kwargs) -> None:
+        """Write the PDF representation of a Document object to a binary stream.
+
+        If a cache folder is set, a PDF rendered before from the same HTML, template and images is reused, and the
+        least recently used PDFs are removed when the cache grows over `PDF_CACHE_MAX_SIZE`.
+        """
+        html = self.get_html(with_hints=False)  # navigation hints are useless in a PDF and would change the cache key
+
+        if self.cache_path is None:
+            self._render(html, stream)
+            return
+
+        cache_file = self.cache_path / f"{self._cache_key(html)}.pdf"
+
+        try:
+            with open(cache_file, "rb") as f:
+                os.utime(f.fileno())  # mark it as recently used, see `prune_pdf_cache`
+                shutil.copyfileobj(f, stream)
+            return
+        except FileNotFoundError:
+            pass
+
+        # a unique temporary file, as other threads or processes may be rendering the same PDF
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.cache_path, prefix=".", suffix=".tmp", delete=False) as tmp_file:
+            try:
+                self._render(html, tmp_file)
+                tmp_file.seek(0)
+                shutil.copyfileobj(tmp_file, stream)
+            except BaseException:
+                os.unlink(tmp_file.name)
+                raise
 
-        return pdf
+        os.replace(tmp_file.name, cache_file)
+        prune_pdf_cache(self.cache_path)
@@ -0,0 +1,10 @@
+"""Import the PDF transformer in the fork server, so renderings forked from it start with WeasyPrint loaded.
+
+WeasyPrint raises an OSError when Pango is missing, which would stop the fork server: the import error is raised
+again by the renderings instead, in their own process.
+"""
+
+try:
+    from . import pdf  # noqa: F401
+except (ImportError, OSError):  # pragma: no cover
+    pass
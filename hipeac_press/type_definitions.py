@@ -88,6 +88,14 @@ class Table:
     rows: list[list[str]]
 
 
+@dataclass
+class PrefetchHint:
+    """Represents a resource that readers will probably need next, e.g. the next document or its images."""
+
+    href: str
+    type: str = "document"
+
+
 @dataclass
 class Document:
     """Represents the entire document."""
@@ -105,3 +113,26 @@ class Document:
 
     prev: NavItem | None = None
     next: NavItem | None = None
+    prefetch: list[PrefetchHint] = field(default_factory=list)
+
+
+@dataclass
+class ManifestItem:
+    """Represents a document in the site manifest."""
+
+    slug: str
+    title: str
+    prev: NavItem | None = None
+    next: NavItem | None = None
+    pages: int | None = None
+    hash: str | None = None
+
+
+@dataclass
+class ManifestSection:
+    """Represents a section of the tree in the site manifest."""
+
+    text: str
+    collapsed: bool = False
+    items: list[ManifestItem] = field(default_factory=list)
+    pdf: str | None = None
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import sys
+import tomllib
+from collections.abc import Iterable
+from pathlib import Path
+
+
+PARENT = Path(__file__).parents[2]
+PRESS_PATHS = ["build.py", "pyproject.toml", "poetry.lock", "hipeac_press", "public/fonts", "public/hipeac.svg"]
+IGNORED_NAMES = {"errors.txt", "__pycache__"}
+SETTINGS = [
+    "VISION_YEAR",
+    "BUILD_PROFILE",
+    "BUILD_EPUB_SPLIT",
+    "BUILD_LINEARIZE_PDF",
+    "BUILD_HTML_PATH",
+    "BUILD_PREFETCH_BUDGET",
+    "BUILD_STATIC_SITE",
+]  # the environment variables changing the outputs of the build
+
+
+def hash_file(path: Path) -> str:
+    """Return the SHA-256 hash of a file, reading it in blocks.
+
+    :param path: The path of the file.
+    :returns: The hex digest of the file contents.
+    """
+    hash_object = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            hash_object.update(block)
+
+    return hash_object.hexdigest()
+
+
+def _is_ignored(path: Path) -> bool:
+    return any(part[0] in ".~" or part in IGNORED_NAMES for part in path.parts)
+
+
+def hash_files(root: Path, paths: Iterable[str] | None = None) -> dict[str, str]:
+    """Hash the files in a folder, or only the given files and subfolders of it.
+
+    Hidden files, lock files (`~...`), caches and the `errors.txt` files written by the build are skipped.
+
+    :param root: The base folder. Keys of the result are relative to it.
+    :param paths: Files and folders relative to `root`. The whole folder is hashed if None.
+    :returns: A sorted dictionary of relative paths and hashes.
+    """
+    files = []
+
+    for path in [root / p for p in paths] if paths is not None else [root]:
+        if path.is_file():
+            files.append(path)
+        elif path.is_dir():
+            files.extend(file for file in path.rglob("*") if file.is_file())
+
+    return {
+        str(file.relative_to(root)): hash_file(file)
+        for file in sorted(files)
+        if not _is_ignored(file.relative_to(root))
+    }
+
+
+def _version() -> str:
+    with open(PARENT / "pyproject.toml", "rb") as f:
+        return tomllib.load(f)["tool"]["poetry"]["version"]
+
+
+def _settings() -> dict[str, str | None]:
+    return {name: os.environ.get(name) for name in SETTINGS}
+
+
+def create_inputs_manifest(source_path: Path) -> dict:
+    """Return every input of the build: the hashes of the sources and press code, and the settings changing outputs.
+
+    The press code includes templates and fonts. The settings are the environment variables in `SETTINGS`.
+
+    :param source_path: The folder with the Vision sources (DOCX, metadata.json, cover...).
+    :returns: The inputs part of a build manifest.
+    """
+    return {
+        "version": _version(),
+        "source": hash_files(source_path),
+        "press": hash_files(PARENT, PRESS_PATHS),
+        "settings": _settings(),
+    }
+
+
+def create_build_manifest(source_path: Path, outputs: dict[str, Path]) -> dict:
+    """Return a manifest with the hashes of every input and output of the build.
+
+    :param source_path: The folder with the Vision sources.
+    :param outputs: Output folders to hash, by name.
+    :returns: The build manifest.
+    """
+    return {
+        "inputs": create_inputs_manifest(source_path),
+        "outputs": {name: hash_files(path) for name, path in outputs.items()},
+    }
+
+
+def read_build_manifest(path: Path) -> dict | None:
+    """Read a build manifest, returning None if it does not exist or cannot be parsed."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_build_manifest(manifest: dict, path: Path) -> None:
+    """Write a build manifest to a JSON file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def diff_hashes(old: dict[str, str], new: dict[str, str]) -> dict[str, list[str]]:
+    """Compare two dictionaries of hashes.
+
+    :returns: The added, changed and removed paths.
+    """
+    return {
+        "added": sorted(new.keys() - old.keys()),
+        "changed": sorted(path for path in new.keys() & old.keys() if new[path] != old[path]),
+        "removed": sorted(old.keys() - new.keys()),
+    }
+
+
+def diff_outputs(old: dict | None, new: dict) -> dict[str, dict[str, list[str]]]:
+    """Compare the outputs of two build manifests, by output folder."""
+    old_outputs = (old or {}).get("outputs", {})
+    return {name: diff_hashes(old_outputs.get(name, {}), hashes) for name, hashes in new["outputs"].items()}
+
+
+if __name__ == "__main__":
+    # Exit with 0 if the inputs of the build described by a manifest have not changed, 1 otherwise:
+    # python -m hipeac_press.utils.build_manifest /app/storage/build/manifest.json
+    previous = read_build_manifest(Path(sys.argv[1]))
+    source = Path(os.environ["VISION_SOURCE_PATH"])
+
+    if previous is None:
+        print("No previous build manifest found.")
+        sys.exit(1)
+
+    inputs = create_inputs_manifest(source)
+
+    for name in ["source", "press"]:
+        for change, paths in diff_hashes(previous["inputs"].get(name, {}), inputs[name]).items():
+            for path in paths:
+                print(f"{change}: {name}/{path}")
+
+    for name, value in inputs["settings"].items():
+        if previous["inputs"].get("settings", {}).get(name) != value:
+            print(f"changed: settings/{name}")
+
+    sys.exit(0 if inputs == previous["inputs"] else 1)
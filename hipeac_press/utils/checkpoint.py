@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+
+from .build_manifest import hash_file
+
+
+def hash_values(*values) -> str:
+    """Return a SHA-256 hash of JSON-serializable values, e.g. the hashes and options a piece of work depends on."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class Checkpoints:
+    """Record the work a build has completed, so a resumed build can skip it.
+
+    Every checkpoint stores the hash of the inputs of the work and the hashes of the files it wrote. Work is done
+    if both still match: a changed input or a missing or modified output (e.g. a PDF stamped afterwards) makes it run
+    again. Checkpoints are written to disk as soon as they are recorded, so they survive a failed build.
+
+    :param path: The JSON file with the checkpoints.
+    :param resume: Whether to use the checkpoints of the previous build. If False, the build starts from scratch and
+        records new checkpoints.
+    """
+
+    def __init__(self, path: Path, *, resume: bool = False):
+        self.path = path
+        self.skipped: set[str] = set()
+        self._lock = threading.Lock()
+        self._checkpoints: dict[str, dict] = {}
+
+        if resume:
+            try:
+                with open(path) as f:
+                    self._checkpoints = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                pass
+
+    def get(self, key: str, inputs: str):
+        """Return the value recorded with a piece of work if it is done and still valid, or None.
+
+        :param key: The name of the work, e.g. `pdf/<slug>`.
+        :param inputs: The hash of the inputs of the work.
+        :returns: The recorded value (True if none was given), or None if the work has to run.
+        """
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+
+        if checkpoint is None or checkpoint["inputs"] != inputs:
+            return None
+
+        for name, output_hash in checkpoint["outputs"].items():
+            if not Path(name).exists() or hash_file(Path(name)) != output_hash:
+                return None
+
+        with self._lock:
+            self.skipped.add(key)
+
+        return checkpoint["value"]
+
+    def record(self, key: str, inputs: str, outputs: Iterable[Path] = (), value=True) -> None:
+        """Record a piece of work as done, with the hashes of its inputs and outputs.
+
+        :param key: The name of the work.
+        :param inputs: The hash of the inputs of the work.
+        :param outputs: The files the work wrote.
+        :param value: A JSON-serializable value to return when the work is skipped, e.g. a page count.
+        """
+        checkpoint = {
+            "inputs": inputs,
+            "outputs": {str(path): hash_file(path) for path in outputs},
+            "value": value,
+        }
+
+        with self._lock:
+            self._checkpoints[key] = checkpoint
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+
+            with open(tmp_path, "w") as f:
+                json.dump(self._checkpoints, f, indent=2, sort_keys=True)
+
+            os.replace(tmp_path, self.path)
+
+    def report(self) -> str:
+        """Return the number of pieces of work skipped thanks to the checkpoints."""
+        return f"Resumed: {len(self.skipped)} checkpoints reused"
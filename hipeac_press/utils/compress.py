@@ -0,0 +1,91 @@
+import gzip
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {
+    ".css", ".html", ".js", ".json", ".map", ".md", ".mjs", ".otf", ".svg", ".ttf", ".txt", ".xml",
+}  # fmt: skip
+MIN_SIZE = 256
+
+
+def _compress_file(path: Path, suffix: str, compress) -> bool:
+    """Write a compressed sibling of a file, if the sibling is missing or out of date.
+
+    The sibling gets the modification time of the source, which is also what nginx uses for its headers.
+
+    :param path: The path of the source file.
+    :param suffix: The suffix of the compressed file, e.g. `.gz`.
+    :param compress: A function that compresses bytes.
+    :returns: True if the compressed file was (re)written.
+    """
+    target = path.with_name(path.name + suffix)
+    stat = path.stat()
+
+    try:
+        if target.stat().st_mtime_ns == stat.st_mtime_ns:
+            return False
+    except FileNotFoundError:
+        pass
+
+    tmp_target = target.with_name(f".{target.name}.tmp")
+    with open(path, "rb") as source, open(tmp_target, "wb") as f:
+        f.write(compress(source.read()))
+
+    os.utime(tmp_target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_target, target)
+    return True
+
+
+def precompress(path: Path, *, with_brotli: bool = False, max_workers: int | None = None) -> int:
+    """Create `.gz` (and optionally `.br`) siblings for the compressible files in a folder.
+
+    Only files that changed since the last run are compressed again. Compressed siblings that this run did not write
+    or keep (their source was removed, shrank below `MIN_SIZE`, or `.br` files when brotli is off) are removed, so nginx
+    never serves an outdated version.
+
+    :param path: The folder with the static files.
+    :param with_brotli: Whether to also create `.br` files. Needs the `brotli` package.
+    :param max_workers: The maximum number of threads to use.
+    :returns: The number of compressed files written.
+    """
+    compressors = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+
+    if with_brotli:
+        if brotli is None:
+            raise ImportError("The `brotli` package is required to create .br files.")
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+
+    jobs = []
+    siblings = []
+
+    for file in path.rglob("*"):
+        if not file.is_file():
+            continue
+        if file.suffix in (".gz", ".br") and Path(file.stem).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            siblings.append(file)
+        elif file.suffix.lower() in COMPRESSIBLE_SUFFIXES and file.stat().st_size >= MIN_SIZE:
+            jobs.extend((file, suffix, compress) for suffix, compress in compressors.items())
+
+    targets = {file.with_name(file.name + suffix) for file, suffix, _ in jobs}
+
+    for sibling in siblings:
+        if sibling not in targets:
+            sibling.unlink()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return sum(executor.map(lambda job: _compress_file(*job), jobs))
+
+
+if __name__ == "__main__":
+    for folder in sys.argv[1:] or ["html"]:
+        written = precompress(Path(folder), with_brotli=os.environ.get("BUILD_BROTLI") == "1")
+        print(f"Compressed {written} files in {folder}")
@@ -1,11 +1,27 @@
+import hashlib
 import http.server
+import os
+import re
 import socket
 import socketserver
 import threading
 import urllib.parse
+import uuid
+import zipfile
+from dataclasses import replace
+from datetime import UTC, datetime
 from pathlib import Path
 
 import pypub
+from jinja2 import FileSystemLoader
+from pypub.builder import EpubBuilder, MimeFile, image_mime, jinja_env, render_template
+
+from ..transformers.html import HtmlTransformer
+from ..type_definitions import Header
+
+
+LOCAL_URL_REGEX = re.compile(rb"http://localhost:\d+/")
+TEMPLATES = jinja_env.overlay(loader=FileSystemLoader(Path(__file__).parent / "templates" / "epub"))
 
 
 def find_available_port():
@@ -40,14 +56,158 @@ def run_server(path: Path, port: int):
     return httpd
 
 
-def generate_epub(tree, destination_path: Path, build_path: Path, title="HiPEAC Vision") -> bytes:
-    """Generate an epub from a tree of sections and items."""
+class ReproducibleEpubBuilder(EpubBuilder):
+    """An EPUB builder that writes the same bytes for the same content.
+
+    pypub uses random UUIDs for the book identifier and the image names, lists files in directory order and stores
+    the modification time of every file in the archive. This builder derives the identifier from the title, names
+    images after their contents, sorts files and uses the publication date for all archive entries.
+    """
+
+    def __init__(self, epub):
+        super().__init__(epub)
+        self.uid = str(uuid.uuid5(uuid.NAMESPACE_URL, epub.title))
+
+    def _rename_images(self):
+        """Rename downloaded images after their contents and update the chapters that reference them.
+
+        pypub also uses the image URL as alt text, so the port of the local image server is removed from it.
+        """
+        renames = {}
+
+        for fname in sorted(os.listdir(self.dirs.images)):
+            if fname == self.cover:
+                continue
+            path = Path(self.dirs.images) / fname
+            new_fname = f"image-{hashlib.sha256(path.read_bytes()).hexdigest()[:16]}{path.suffix}"
+            path.rename(path.with_name(new_fname))
+            renames[fname] = new_fname
+
+        for assign, _ in self.chapters:
+            path = Path(self.dirs.oebps) / assign.link
+            content = LOCAL_URL_REGEX.sub(b"", path.read_bytes())
+            for fname, new_fname in renames.items():
+                content = content.replace(fname.encode(), new_fname.encode())
+            path.write_bytes(content)
+
+    def index(self):
+        """Build index files, listing styles and images in sorted order, with a nested table of contents."""
+        if not self.dirs or not self.cover:
+            raise RuntimeError("cannot index epub before `begin`")
+
+        self._rename_images()
+        kwargs = {
+            "uid": self.uid,
+            "epub": self.epub,
+            "cover": MimeFile(self.cover, image_mime(self.cover)),
+            "styles": sorted(os.listdir(self.dirs.styles)),
+            "chapters": self.chapters,
+            "images": [
+                MimeFile(fname, image_mime(fname))
+                for fname in sorted(os.listdir(self.dirs.images))
+                if fname != self.cover
+            ],
+        }
+
+        render_template("book.opf.j2", self.dirs.oebps, self.encoding, kwargs)
+
+        # the table of contents nests the parts of split chapters under their first part
+        toc = []
+        for assign, chapter in self.chapters:
+            if getattr(chapter, "is_part", False) and toc:
+                toc[-1][2].append((assign, chapter))
+            else:
+                toc.append((assign, chapter, []))
+
+        kwargs.update(toc=toc, depth=2 if any(parts for _, _, parts in toc) else 1)
+
+        for template in ["book.ncx.j2", "toc.xhtml.j2"]:
+            with open(Path(self.dirs.oebps) / template.removesuffix(".j2"), "w", encoding=self.encoding) as f:
+                f.write(TEMPLATES.get_template(template).render(**kwargs))
+
+    def compress(self, fpath: str | None = None) -> str:
+        """Zip the book, with the `mimetype` file first and fixed timestamps."""
+        if not self.dirs:
+            raise RuntimeError("cannot finalize before `begin`")
+
+        fpath = fpath or f"{self.epub.title}.epub"
+        basedir = Path(self.dirs.basedir)
+        files = sorted(path.relative_to(basedir).as_posix() for path in basedir.rglob("*") if path.is_file())
+        files.sort(key=lambda name: name != "mimetype")
+        date_time = max(self.epub.date.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+        with zipfile.ZipFile(fpath, "w", zipfile.ZIP_DEFLATED) as zip_file:
+            for name in files:
+                info = zipfile.ZipInfo(name, date_time=date_time)
+                info.compress_type = zipfile.ZIP_STORED if name == "mimetype" else zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                zip_file.writestr(info, (basedir / name).read_bytes())
+
+        return fpath
+
+
+def _split_at_h2(document) -> list[tuple[str | None, list]]:
+    """Split the elements of a document at its level 2 headers, which are left out (they become chapter titles).
+
+    The first part is the entry of the document in the table of contents. If the document starts with a header, the
+    first part is the one of that header, which is kept in its elements.
+
+    :returns: The title (None for the first part) and the elements of every part.
+    """
+    parts = [(None, [])]
+
+    for element in document.elements:
+        if isinstance(element, Header) and element.level == 2 and parts != [(None, [])]:
+            parts.append((element.text, []))
+        else:
+            parts[-1][1].append(element)
+
+    return parts
+
+
+def _add_split_chapters(epub, item, base_url: str):
+    """Add a document as one chapter per H2 section. Citations link to the references, kept in the last part."""
+    document = item.document
+    parts = _split_at_h2(document)
+    assignments = [epub.assign_chapter() for _ in parts]
+
+    for i, ((part_title, elements), assignment) in enumerate(zip(parts, assignments, strict=True)):
+        html = HtmlTransformer(replace(document, elements=elements)).get_html(
+            v=4,
+            with_hints=False,
+            with_references=i == len(parts) - 1,
+            link_citations=assignments[-1].link,
+        )
+        chapter = pypub.create_chapter_from_html(html.replace("./images/", f"{base_url}/images/").encode("utf-8"))
+        chapter.title = part_title or item.title
+        chapter.is_part = part_title is not None
+        epub.chapters.append((assignment, chapter))
+
+
+def generate_epub(
+    tree,
+    destination_path: Path,
+    build_path: Path,
+    title="HiPEAC Vision",
+    *,
+    split_chapters: bool = False,
+) -> bytes:
+    """Generate an epub from a tree of sections and items.
+
+    The publication date is the date of the most recently updated item, so the epub only changes with its content.
+
+    :param split_chapters: Whether to split documents at their H2 headers into several chapters, nested in the table
+        of contents. Smaller files open and paginate faster on low-end e-readers.
+    """
+    updated_at = [item.document.updated_at for section in tree for item in section["items"] if item.document.updated_at]
     epub = pypub.Epub(
         title=title,
         creator="HiPEAC",
         language="en",
         publisher="HiPEAC",
         cover=str(destination_path / "cover.jpg"),
+        date=max(updated_at, default=datetime(1980, 1, 1, tzinfo=UTC)),
+        builder_factory=ReproducibleEpubBuilder,
     )
 
     port = find_available_port()
@@ -61,7 +221,11 @@ def generate_epub(tree, destination_path: Path, build_path: Path, title="HiPEAC
     try:
         for section in tree:
             for item in section["items"]:
-                html = item.export(format="html", v=4).decode("utf-8")
+                if split_chapters:
+                    _add_split_chapters(epub, item, base_url)
+                    continue
+
+                html = item.export(format="html", v=4, with_hints=False).decode("utf-8")
                 html = html.replace("./images/", f"{base_url}/images/")
                 chapter = pypub.create_chapter_from_html(html.encode("utf-8"))
                 chapter.title = item.title
@@ -0,0 +1,100 @@
+import gc
+import sys
+from pathlib import Path
+
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+# the largest RSS seen in the child processes watched with `watch_rss`, which are not children of the build process
+# when started from the fork server, so `RUSAGE_CHILDREN` does not include them
+_watched_rss = 0
+
+
+def process_rss(pid: int) -> int | None:
+    """Return the current resident set size of a process, in bytes.
+
+    :param pid: The process ID.
+    :returns: The RSS, or None if it cannot be read: the process has exited, or `/proc` is not available (e.g. macOS).
+    """
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def watch_rss(pid: int) -> int | None:
+    """Return the current RSS of a child process, like `process_rss`, and include it in the peak RSS of the children."""
+    global _watched_rss
+    rss = process_rss(pid)
+    _watched_rss = max(_watched_rss, rss or 0)
+    return rss
+
+
+def peak_rss() -> dict[str, int]:
+    """Return the peak resident set size of this process and of its largest child process.
+
+    :returns: The peak RSS in bytes, by `build` and `children`. Empty if the `resource` module is not available.
+    """
+    if resource is None:
+        return {}
+
+    unit = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return {
+        "build": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        "children": max(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit, _watched_rss),
+    }
+
+
+def memory_report(budget: int | None = None) -> str:
+    """Return a report of the peak RSS reached by the build, compared to the memory budget.
+
+    :param budget: The memory budget in bytes, if any.
+    """
+    peaks = peak_rss()
+
+    if not peaks:
+        return "Peak RSS: not available"
+
+    report = f"Peak RSS: {peaks['build'] // 2**20} MB (build), {peaks['children'] // 2**20} MB (largest child process)"
+
+    if budget:
+        status = "over" if max(peaks.values()) > budget else "within"
+        report += f", {status} the budget of {budget // 2**20} MB"
+
+    return report
+
+
+def bounded_workers(workers: int, budget: int | None, worker_memory: int) -> int:
+    """Return how many worker processes fit in a memory budget.
+
+    :param workers: The number of workers wanted.
+    :param budget: The memory budget in bytes. The number of workers is not bounded if None.
+    :param worker_memory: The estimated memory used by each worker, in bytes.
+    :returns: The number of workers, at least 1.
+    """
+    if not budget:
+        return workers
+
+    return max(1, min(workers, budget // worker_memory))
+
+
+def spill_tree(tree, folder: Path) -> None:
+    """Spill the documents of a tree to disk, so only their paths stay in memory.
+
+    :param tree: The tree structure containing sections and items.
+    :param folder: The folder where the documents are written.
+    """
+    for section in tree:
+        for item in section["items"]:
+            item.spill(folder)
+
+    gc.collect()
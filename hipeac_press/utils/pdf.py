@@ -1,3 +1,4 @@
+import tempfile
 from io import BytesIO
 from pathlib import Path
 
@@ -10,6 +11,50 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 from svglib.svglib import svg2rlg
 
+from .slug import slugify
+
+
+try:
+    import pikepdf
+except ImportError:  # pragma: no cover
+    pikepdf = None
+
+
+def write_pdf(writer: PdfWriter, path: Path, *, linearize: bool = False):
+    """Write a PDF to a file, optionally linearized ("fast web view").
+
+    Linearized PDFs let viewers show the first pages before the whole file is downloaded, using byte-range requests.
+    Linearization needs the `pikepdf` package, and the output is checked after writing.
+
+    :param writer: The PDF to write.
+    :param path: The path of the output file.
+    :param linearize: Whether to linearize the PDF.
+    """
+    if not linearize:
+        with open(path, "wb") as f:
+            writer.write(f)
+        return
+
+    if pikepdf is None:
+        raise ImportError("The `pikepdf` package is required to write linearized PDFs.")
+
+    with BytesIO() as bytes_stream:
+        writer.write(bytes_stream)
+        bytes_stream.seek(0)
+
+        with pikepdf.open(bytes_stream) as pdf:
+            _save_pikepdf(pdf, path, linearize=True)
+
+
+def _save_pikepdf(pdf, path: Path, *, linearize: bool):
+    """Save a `pikepdf.Pdf`, checking that it is linearized if requested."""
+    pdf.save(path, linearize=linearize, deterministic_id=True)
+
+    if linearize:
+        with pikepdf.open(path) as saved_pdf:
+            if not saved_pdf.is_linearized:
+                raise RuntimeError(f"PDF is not linearized: {path}")
+
 
 def draw(article_title: str, num: int, vision_year: str, logo_path: str = None) -> PdfReader:
     """Generate a header for the PDFs.
@@ -48,13 +93,15 @@ def draw(article_title: str, num: int, vision_year: str, logo_path: str = None)
     return PdfReader(b)
 
 
-def set_headers_footers(item, pdf_path: Path, vision_year: str, logo_path: str):
+def set_headers_footers(item, pdf_path: Path, vision_year: str, logo_path: str, *, linearize: bool = False) -> int:
     """Set headers and footers for individual PDF files.
 
     :param item: The item to set headers and footers.
     :param pdf_path: The path where individual PDFs are stored.
     :param vision_year: The vision year.
     :param logo_path: The path to the logo image.
+    :param linearize: Whether to write a linearized PDF.
+    :returns: The number of pages of the PDF.
     """
     pdf_file_path = pdf_path / f"{item.slug}.pdf"
     pdf_reader = PdfReader(pdf_file_path)
@@ -65,19 +112,114 @@ def set_headers_footers(item, pdf_path: Path, vision_year: str, logo_path: str):
         page.merge_page(header_footer.pages[0], True)
         writer.add_page(page)
 
-    with open(pdf_file_path, "wb") as f:
-        writer.write(f)
+    write_pdf(writer, pdf_file_path, linearize=linearize)
+
+    return len(pdf_reader.pages)
+
+
+def _add_article_pages(writer: PdfWriter, pdf_file_path: Path, title: str, i: int, vision_year: str) -> int:
+    """Add the pages of an article to a writer, with headers and a blank page so the next article starts on the right.
+
+    :param i: The number of pages before the article.
+    :returns: The number of pages after the article.
+    """
+    pdf_reader = PdfReader(pdf_file_path)
+
+    for page in pdf_reader.pages:
+        i += 1
+        page.merge_page(draw(title, i, vision_year).pages[0], True)
+        writer.add_page(page)
+
+    if len(pdf_reader.pages) % 2 == 1:
+        i += 1
+        blank_page = PageObject.create_blank_page(pdf_reader)
+        blank_page.merge_page(draw(title, i, vision_year).pages[0], True)
+        writer.add_page(blank_page)
+
+    return i
+
+
+def _article_pdfs(tree, pdf_path: Path):
+    """Yield the section name, title and PDF file of every article in the tree, skipping the ones without a PDF."""
+    for section in tree:
+        for item in section["items"]:
+            if not (pdf_path / f"{item.slug}.pdf").exists():
+                print("PDF not found, skipping", item.title)
+                continue
 
+            yield section["text"], item.title, pdf_path / f"{item.slug}.pdf"
 
-def concatenate_pdfs(tree, pdf_path: Path, vision_year: str, *, cover_pdf: Path | None = None):
+
+def _add_to_range(ranges: dict[str, tuple[int, int]], section: str, start: int, end: int):
+    """Extend the page range of a section with the pages of an article."""
+    ranges[section] = (ranges[section][0] if section in ranges else start, end)
+
+
+def _concatenate_low_memory(
+    tree, pdf_path: Path, vision_year: str, output_path: Path, cover_pdf, linearize: bool
+) -> dict[str, tuple[int, int]]:
+    """Concatenate PDFs stamping one article at a time into a temporary file, and merging the files with pikepdf.
+
+    pikepdf reads objects from the files when they are written, so the whole book is never loaded in Python.
+    """
+    ranges = {}
+
+    with tempfile.TemporaryDirectory() as tmp_folder, pikepdf.new() as book:
+        sources = []
+        i = 0
+
+        try:
+            if cover_pdf:
+                sources.append(pikepdf.open(cover_pdf))
+                book.pages.extend(sources[-1].pages)
+                i += len(sources[-1].pages)
+
+            for n, (section, title, pdf_file_path) in enumerate(_article_pdfs(tree, pdf_path)):
+                writer = PdfWriter()
+                start, i = i, _add_article_pages(writer, pdf_file_path, title, i, vision_year)
+                _add_to_range(ranges, section, start, i)
+                part_path = Path(tmp_folder) / f"{n}.pdf"
+                write_pdf(writer, part_path)
+                del writer
+
+                sources.append(pikepdf.open(part_path))
+                book.pages.extend(sources[-1].pages)
+
+            _save_pikepdf(book, output_path, linearize=linearize)
+        finally:
+            for source in sources:
+                source.close()
+
+    return ranges
+
+
+def concatenate_pdfs(
+    tree,
+    pdf_path: Path,
+    vision_year: str,
+    *,
+    cover_pdf: Path | None = None,
+    linearize: bool = False,
+    low_memory: bool = False,
+) -> dict[str, tuple[int, int]]:
     """Concatenate PDFs and add headers.
 
     :param tree: The tree structure containing sections and items.
     :param pdf_path: The path where individual PDFs are stored.
     :param vision_year: The vision year.
     :param cover_pdf: The path to the cover PDF file.
+    :param linearize: Whether to write a linearized PDF.
+    :param low_memory: Whether to keep only one article in memory at a time. Needs the `pikepdf` package, the whole
+        book is built in memory without it.
+    :returns: The range of pages (start included, end excluded, from 0) of every section in the book.
     """
+    output_path = pdf_path / f"hipeac-vision-{vision_year}.pdf"
+
+    if low_memory and pikepdf is not None:
+        return _concatenate_low_memory(tree, pdf_path, vision_year, output_path, cover_pdf, linearize)
+
     writer = PdfWriter()
+    ranges = {}
     i = 0
 
     if cover_pdf:
@@ -86,24 +228,52 @@ def concatenate_pdfs(tree, pdf_path: Path, vision_year: str, *, cover_pdf: Path
             i += 1
             writer.add_page(page)
 
-    for _, section in enumerate(tree):
-        for item in section["items"]:
-            pdf_reader = PdfReader(pdf_path / f"{item.slug}.pdf")
+    for section, title, pdf_file_path in _article_pdfs(tree, pdf_path):
+        start, i = i, _add_article_pages(writer, pdf_file_path, title, i, vision_year)
+        _add_to_range(ranges, section, start, i)
 
-            for page in pdf_reader.pages:
-                i += 1
-                page.merge_page(draw(item.title, i, vision_year).pages[0], True)
-                writer.add_page(page)
+    write_pdf(writer, output_path, linearize=linearize)
 
-            if len(pdf_reader.pages) % 2 == 1:
-                i += 1
-                blank_page = PageObject.create_blank_page(pdf_reader)
-                blank_page.merge_page(draw(item.title, i, vision_year).pages[0], True)
-                writer.add_page(blank_page)
+    return ranges
 
-    with BytesIO() as bytes_stream:
-        writer.write(bytes_stream)
-        bytes_stream.seek(0)
 
-        with open(pdf_path / f"hipeac-vision-{vision_year}.pdf", "wb") as f:
-            f.write(bytes_stream.read())
+def split_sections(
+    pdf_path: Path,
+    vision_year: str,
+    ranges: dict[str, tuple[int, int]],
+    *,
+    linearize: bool = False,
+    low_memory: bool = False,
+) -> dict[str, str]:
+    """Write one PDF per section, copying its pages from the book.
+
+    The pages are already stamped, so nothing is rendered again and the page numbers are the ones of the book.
+
+    :param pdf_path: The path where the book is stored. Section PDFs are written next to it.
+    :param vision_year: The vision year.
+    :param ranges: The range of pages of every section in the book, as returned by `concatenate_pdfs`.
+    :param linearize: Whether to write linearized PDFs.
+    :param low_memory: Whether to copy the pages with `pikepdf`, without loading the whole book in Python.
+    :returns: The file name of the PDF of every section.
+    """
+    book_path = pdf_path / f"hipeac-vision-{vision_year}.pdf"
+    file_names = {section: f"hipeac-vision-{vision_year}-{slugify(section)}.pdf" for section in ranges}
+
+    if low_memory and pikepdf is not None:
+        with pikepdf.open(book_path) as book:
+            for section, (start, end) in ranges.items():
+                with pikepdf.new() as section_pdf:
+                    section_pdf.pages.extend(book.pages[start:end])
+                    _save_pikepdf(section_pdf, pdf_path / file_names[section], linearize=linearize)
+
+        return file_names
+
+    book = PdfReader(book_path)
+
+    for section, (start, end) in ranges.items():
+        writer = PdfWriter()
+        for page in book.pages[start:end]:
+            writer.add_page(page)
+        write_pdf(writer, pdf_path / file_names[section], linearize=linearize)
+
+    return file_names
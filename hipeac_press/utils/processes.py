@@ -0,0 +1,34 @@
+import multiprocessing
+from multiprocessing.context import BaseContext
+
+
+# modules the fork server imports before forking any child, see `preload`
+_preload_modules = ["__main__"]
+
+
+def preload(module: str) -> None:
+    """Import a module in the fork server, so the child processes forked from it do not import it each time.
+
+    It only has an effect before the first child process is started. The fork server stops if importing the module
+    raises anything but an ImportError, so modules with system dependencies must be imported through a guard.
+
+    :param module: The name of the module.
+    """
+    if module not in _preload_modules:
+        _preload_modules.append(module)
+
+
+def process_context() -> BaseContext:
+    """Return the context to start child processes with: `forkserver` where available, `spawn` otherwise.
+
+    The build starts child processes from the threads running its stages. Forking a multi-threaded process copies the
+    locks held by the other threads, which can deadlock the child; the fork server is a single-threaded process
+    started once, from which the children are forked instead. Scripts starting child processes must guard their entry
+    point with `if __name__ == "__main__"`, as the fork server imports the main module.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(_preload_modules)
+        return context
+
+    return multiprocessing.get_context("spawn")  # pragma: no cover
@@ -0,0 +1,102 @@
+import json
+import statistics
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+# Rough costs of a rendering without history, in seconds. Only the order of the estimates matters.
+BASE_SECONDS = 1.0
+SECONDS_PER_MB = 2.0
+SECONDS_PER_IMAGE = 0.5
+
+
+class RenderCosts:
+    """The render times and page counts of the articles in previous builds, used to estimate the next renderings.
+
+    :param path: The JSON file with the recorded costs, by slug.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        try:
+            with open(path) as f:
+                self.costs: dict[str, dict] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.costs = {}
+
+    def estimate(self, slug: str, *, docx_size: int, images: int) -> float:
+        """Return the estimated seconds of a rendering.
+
+        The time of the previous rendering is used if there is one. Otherwise the estimate comes from the page count of
+        the previous build and the median time per page of the other articles, or from the DOCX size and image count.
+
+        :param slug: The slug of the article.
+        :param docx_size: The size of the DOCX file, in bytes.
+        :param images: The number of images of the article.
+        :returns: The estimated seconds.
+        """
+        cost = self.costs.get(slug, {})
+
+        if cost.get("seconds") is not None:
+            return cost["seconds"]
+
+        seconds_per_page = [
+            other["seconds"] / other["pages"]
+            for other in self.costs.values()
+            if other.get("seconds") and other.get("pages")
+        ]
+        if cost.get("pages") and seconds_per_page:
+            return cost["pages"] * statistics.median(seconds_per_page)
+
+        return BASE_SECONDS + SECONDS_PER_MB * docx_size / 2**20 + SECONDS_PER_IMAGE * images
+
+    def record(self, slug: str, *, seconds: float | None = None, pages: int | None = None) -> None:
+        """Record the render time or the page count of an article."""
+        cost = self.costs.setdefault(slug, {})
+
+        if seconds is not None:
+            cost["seconds"] = round(seconds, 3)
+        if pages is not None:
+            cost["pages"] = pages
+
+    def save(self) -> None:
+        """Write the recorded costs to the JSON file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.path, "w") as f:
+            json.dump(self.costs, f, indent=2, sort_keys=True)
+
+
+def run_longest_first(jobs: dict[str, float], run: Callable[[str], float], *, workers: int = 1) -> dict[str, float]:
+    """Run jobs in a thread pool, the longest ones first, printing the progress with an estimated time left.
+
+    Starting the longest jobs first keeps a big job from starting last and running alone at the end, which shortens
+    the total time. The estimated time left scales the estimates of the remaining jobs by the time actually taken by
+    the finished ones.
+
+    :param jobs: The estimated seconds of every job, by name.
+    :param run: The function running a job by name and returning the seconds it took. It is called from threads, so it
+        should do the heavy work in a child process (e.g. `render_with_watchdog`).
+    :param workers: The number of jobs running at the same time.
+    :returns: The seconds every job took, by name.
+    """
+    timings = {}
+    total = sum(jobs.values())
+    remaining = total
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {executor.submit(run, name): name for name in sorted(jobs, key=lambda name: -jobs[name])}
+
+        for future in as_completed(futures):
+            name = futures[future]
+            timings[name] = future.result()
+            remaining -= jobs[name]
+            elapsed = time.perf_counter() - start
+            eta = elapsed * remaining / (total - remaining) if total > remaining else 0.0
+            print(f"[{len(timings)}/{len(jobs)}] {timings[name]:6.2f}s  {name}  (ETA {eta:.0f}s)")
+
+    return timings
@@ -0,0 +1,128 @@
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Stage:
+    """Represents a stage of the build, with the artifacts it reads and writes."""
+
+    name: str
+    func: Callable[[], None]
+    inputs: list[str] = field(default_factory=list)
+    outputs: list[str] = field(default_factory=list)
+    seconds: float | None = None
+
+
+class Scheduler:
+    """Run the stages of a build as a dependency graph.
+
+    A stage depends on the stages that produce its inputs. Stages whose inputs are ready run concurrently in a thread
+    pool; the heavy work (e.g. PDF rendering) already runs in child processes.
+
+    :param max_workers: The maximum number of stages running at the same time.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers
+        self.stages: dict[str, Stage] = {}
+
+    def stage(self, *, inputs: Iterable[str] = (), outputs: Iterable[str] = (), name: str | None = None):
+        """Register a function as a stage of the build.
+
+        :param inputs: The artifacts the stage needs.
+        :param outputs: The artifacts the stage produces.
+        :param name: The name of the stage. The name of the function is used if None.
+        """
+
+        def decorator(func: Callable[[], None]) -> Callable[[], None]:
+            stage = Stage(name=name or func.__name__, func=func, inputs=list(inputs), outputs=list(outputs))
+            self.stages[stage.name] = stage
+            return func
+
+        return decorator
+
+    def dependencies(self) -> dict[str, set[str]]:
+        """Return the names of the stages each stage depends on.
+
+        :raises ValueError: If an input is not produced by any stage, or an output is produced by several stages.
+        """
+        producers = {}
+
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Artifact `{output}` is produced by `{producers[output]}` and `{stage.name}`")
+                producers[output] = stage.name
+
+        dependencies = {}
+
+        for stage in self.stages.values():
+            missing = [artifact for artifact in stage.inputs if artifact not in producers]
+            if missing:
+                raise ValueError(f"Stage `{stage.name}` needs artifacts that no stage produces: {missing}")
+            dependencies[stage.name] = {producers[artifact] for artifact in stage.inputs}
+
+        return dependencies
+
+    def _run_stage(self, stage: Stage) -> None:
+        start = time.perf_counter()
+        stage.func()
+        stage.seconds = time.perf_counter() - start
+
+    def run(self) -> None:
+        """Run all stages, each one as soon as the stages it depends on are done.
+
+        If a stage fails, no new stages are started and the exception is raised once the running ones finish.
+        """
+        dependencies = self.dependencies()
+        pending = dict(dependencies)
+        done = set()
+        running: dict[Future, str] = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name in [name for name, requires in pending.items() if requires <= done]:
+                        del pending[name]
+                        running[executor.submit(self._run_stage, self.stages[name])] = name
+
+                if not running:
+                    if error is None:
+                        raise ValueError(f"Stages with circular dependencies: {sorted(pending)}")
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                    else:
+                        done.add(name)
+
+        if error is not None:
+            raise error
+
+    def critical_path(self) -> list[str]:
+        """Return the chain of dependent stages that took the longest, which bounds the total build time."""
+        dependencies = self.dependencies()
+        longest: dict[str, tuple[float, list[str]]] = {}
+
+        def visit(name: str) -> tuple[float, list[str]]:
+            if name not in longest:
+                before = max((visit(dependency) for dependency in dependencies[name]), default=(0.0, []))
+                longest[name] = (before[0] + (self.stages[name].seconds or 0.0), [*before[1], name])
+            return longest[name]
+
+        return max((visit(name) for name in self.stages), default=(0.0, []))[1]
+
+    def report(self) -> str:
+        """Return the time each stage took, and the critical path."""
+        lines = [
+            f"{stage.seconds or 0.0:8.2f}s  {stage.name}"
+            for stage in sorted(self.stages.values(), key=lambda stage: -(stage.seconds or 0.0))
+        ]
+        return "\n".join(["Build stages:", *lines, "Critical path: " + " -> ".join(self.critical_path())])
@@ -0,0 +1,113 @@
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from ..type_definitions import BulletList, Header, OrderedList, Paragraph, Quote
+from .slug import heading_slugify, unique_slug
+
+
+STOPWORDS = {
+    "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has", "have", "in", "is", "it", "its", "of",
+    "on", "or", "that", "the", "their", "this", "to", "was", "were", "which", "will", "with",
+}  # fmt: skip
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into normalized search terms.
+
+    Markdown formatting markers are ignored, accents are removed and stopwords are skipped.
+
+    :param text: The text to tokenize.
+    :returns: The list of terms, in order of appearance.
+    """
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [term for term in re.findall(r"[a-z0-9]+", text) if len(term) > 1 and term not in STOPWORDS]
+
+
+def _element_texts(element) -> list[str]:
+    """Return the searchable texts of a document element."""
+    if isinstance(element, Header | Paragraph):
+        return [element.text]
+    if isinstance(element, BulletList | OrderedList):
+        return element.items
+    if isinstance(element, Quote):
+        return [element.text, element.ref.text] if element.ref else [element.text]
+    return []
+
+
+def build_search_index(tree) -> tuple[list[list[str]], dict[str, list[list]]]:
+    """Build an inverted index from the documents in a tree.
+
+    Each term maps to a list of `[document index, anchor]` postings, where the anchor is the id Vitepress gives to the
+    closest previous header (empty for the top of the page).
+
+    :param tree: The tree structure containing sections and items.
+    :returns: The list of `[slug, title]` documents and the inverted index.
+    """
+    documents = []
+    index = {}
+    seen = set()
+
+    for section in tree:
+        for item in section["items"]:
+            doc_index = len(documents)
+            documents.append([item.slug, item.title])
+            anchor = ""
+            anchors = set()
+
+            texts = [(anchor, item.title)]
+            for element in item.document.elements:
+                if isinstance(element, Header):
+                    slug = unique_slug(heading_slugify(element.text.replace("*", "")), anchors)
+                    anchor = slug if element.level > 1 else anchor
+                texts.extend((anchor, text) for text in _element_texts(element))
+
+            if item.document.references:
+                anchor = unique_slug("references", anchors)  # the header added by the markdown transformer
+                texts.extend((anchor, f"{ref.code} {ref.text}") for ref in item.document.references)
+
+            for text_anchor, text in texts:
+                for term in tokenize(text):
+                    if (term, doc_index, text_anchor) not in seen:
+                        seen.add((term, doc_index, text_anchor))
+                        index.setdefault(term, []).append([doc_index, text_anchor])
+
+    return documents, index
+
+
+def generate_search_index(tree, search_path: Path, *, prefix_length: int = 2) -> Path:
+    """Write a sharded search index for the documents in a tree.
+
+    Terms are grouped in shards by their first `prefix_length` characters, so a client only needs to load
+    `index.json` and the shards matching the terms of a query, `shards/<prefix>.json`.
+
+    :param tree: The tree structure containing sections and items.
+    :param search_path: The folder where the index files are written.
+    :param prefix_length: The number of characters used as shard key.
+    :returns: The path to the `index.json` file.
+    """
+    documents, index = build_search_index(tree)
+    shards = {}
+
+    for term in sorted(index):
+        shards.setdefault(term[:prefix_length], {})[term] = index[term]
+
+    (search_path / "shards").mkdir(parents=True, exist_ok=True)
+    for old_file in [*search_path.glob("*.json"), *(search_path / "shards").glob("*.json")]:
+        old_file.unlink()
+
+    for key, shard in shards.items():
+        with open(search_path / "shards" / f"{key}.json", "w") as shard_file:
+            shard_file.write(json.dumps(shard, separators=(",", ":")))
+
+    index_path = search_path / "index.json"
+    with open(index_path, "w") as index_file:
+        index_file.write(
+            json.dumps(
+                {"prefix_length": prefix_length, "documents": documents, "shards": sorted(shards)},
+                separators=(",", ":"),
+            )
+        )
+
+    return index_path
@@ -17,3 +17,34 @@ def slugify(value: str, allow_unicode: bool = False) -> str:
     value = re.sub(r"[^\w\s-]", "", value.lower())
 
     return re.sub(r"[-\s]+", "-", value).strip("-_")
+
+
+# the character classes of the `slugify` of `@mdit-vue/shared`, used by Vitepress for heading anchors
+HEADING_SPECIAL_REGEX = re.compile(r"[\s~`!@#$%^&*()\-_+=\[\]{}|\\;:\"'“”‘’<>,.?/]+")
+HEADING_REMOVED_REGEX = re.compile(r"[\u0300-\u036f\u0000-\u001f]")
+
+
+def heading_slugify(value: str) -> str:
+    """Convert a heading to the anchor id given by Vitepress.
+
+    Duplicated headings of a page get a `-1`, `-2`... suffix from Vitepress, see `unique_slug`.
+
+    :param value: The text of the heading, without markdown formatting.
+    :returns: The anchor id.
+    """
+    value = HEADING_REMOVED_REGEX.sub("", unicodedata.normalize("NFKD", value))
+    value = re.sub(r"-{2,}", "-", HEADING_SPECIAL_REGEX.sub("-", value)).strip("-")
+    return re.sub(r"^(\d)", r"_\1", value).lower()
+
+
+def unique_slug(slug: str, taken: set[str]) -> str:
+    """Return a slug not in `taken`, adding a `-1`, `-2`... suffix if needed, and add it to `taken`."""
+    unique = slug
+    i = 1
+
+    while unique in taken:
+        unique = f"{slug}-{i}"
+        i += 1
+
+    taken.add(unique)
+    return unique
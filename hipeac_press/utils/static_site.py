@@ -0,0 +1,323 @@
+import html
+import json
+import os
+import re
+import shutil
+from functools import cache
+from pathlib import Path
+from string import Template
+
+import markdown2
+import yaml
+
+from ..manifest import SiteManifest
+from ..transformers.html import HtmlTransformer
+from .build_manifest import hash_file
+from .slug import slugify
+from .sync import copy_file
+
+
+TEMPLATES_PATH = Path(__file__).parent / "templates"
+IMAGE_URL_REGEX = re.compile(r"(src|href)='\.?/images/([^']+)'")
+FRONTMATTER_REGEX = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+STATE_FILE = ".static_site.json"
+
+
+@cache
+def _page_template() -> Template:
+    return Template((TEMPLATES_PATH / "page.html").read_text())
+
+
+def read_markdown(path: Path) -> tuple[dict, str]:
+    """Read a markdown file of the Vision folder, returning its Vitepress frontmatter and its content.
+
+    :param path: The path of the markdown file. A missing file is read as an empty one.
+    :returns: The parsed frontmatter (empty if there is none) and the markdown after it.
+    """
+    text = path.read_text() if path.exists() else ""
+    match = FRONTMATTER_REGEX.match(text)
+
+    if match is None:
+        return {}, text
+
+    frontmatter = yaml.safe_load(match.group(1))
+    return frontmatter if isinstance(frontmatter, dict) else {}, text[match.end() :]
+
+
+def write_if_changed(path: Path, content: bytes) -> bool:
+    """Write a file only if its content changes, so unchanged files keep their modification time.
+
+    :param path: The path of the file.
+    :param content: The new content.
+    :returns: True if the file was written.
+    """
+    try:
+        if path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+    return True
+
+
+class StaticSite:
+    """Write the site as static HTML into the folder served by nginx, without the Vitepress build.
+
+    Pages use the same HTML as the other outputs (`HtmlTransformer`). Stylesheets and images are copied to the
+    `assets` folder under names with their content hash, so they can be cached forever. Only changed files are
+    rewritten, and files written by a previous run that are no longer part of the site are removed.
+
+    :param site: The site manifest, used for the sidebar and the navigation.
+    :param html_path: The output folder, e.g. `/app/html`.
+    :param build_path: The build folder, with the images and the `index.md` and `archive.md` pages.
+    :param year: The Vision year.
+    """
+
+    def __init__(self, site: SiteManifest, html_path: Path, *, build_path: Path, year: str):
+        self.site = site
+        self.html_path = html_path
+        self.build_path = build_path
+        self.year = year
+        self.files: set[str] = set()
+        self.changed: list[str] = []
+        self._assets: dict[Path, str] = {}
+
+    def _write(self, relative_path: str, content: bytes) -> None:
+        self.files.add(relative_path)
+        if write_if_changed(self.html_path / relative_path, content):
+            self.changed.append(relative_path)
+
+    def asset(self, path: Path) -> str:
+        """Copy a file to the assets folder, named after its content hash, and return its URL."""
+        if path not in self._assets:
+            name = f"{path.stem}.{hash_file(path)[:8]}{path.suffix}"
+            self.files.add(f"assets/{name}")
+
+            if not (self.html_path / "assets" / name).exists():
+                (self.html_path / "assets").mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, self.html_path / "assets" / name)
+                self.changed.append(f"assets/{name}")
+
+            self._assets[path] = f"/assets/{name}"
+
+        return self._assets[path]
+
+    def copy_public(self, public_path: Path) -> None:
+        """Copy the public folder (PDFs, EPUB, search index, fonts) to the root of the site, skipping hidden files.
+
+        The build writes these files again every time, so they are compared by checksum rather than modification time.
+        """
+        for file in sorted(public_path.rglob("*")):
+            relative_path = file.relative_to(public_path)
+            if file.is_file() and not any(part[0] == "." for part in relative_path.parts):
+                self.files.add(relative_path.as_posix())
+                if copy_file(file, self.html_path / relative_path, checksum=True):
+                    self.changed.append(relative_path.as_posix())
+
+    def _sidebar(self, current: str | None) -> str:
+        html_parts = []
+
+        for section in self.site.sections:
+            items = "".join(
+                f"<li><a href='/{item.slug}'{' class=active' if item.slug == current else ''}>"
+                f"{html.escape(item.title)}</a></li>"
+                for item in section.items
+            )
+            if section.pdf:
+                items += f"<li><a href='/pdf/{section.pdf}' target='_blank'>Download PDF</a></li>"
+            is_open = not section.collapsed or any(item.slug == current for item in section.items)
+            html_parts.append(
+                f"<details{' open' if is_open else ''}><summary>{html.escape(section.text)}</summary>"
+                f"<ul>{items}</ul></details>"
+            )
+
+        return "\n".join(html_parts)
+
+    @staticmethod
+    def _pager(item) -> str:
+        links = [
+            f"<a class='{rel}' href='{nav.link}'>{label}<br><strong>{html.escape(nav.text)}</strong></a>"
+            for rel, label, nav in [("prev", "Previous page", item.prev), ("next", "Next page", item.next)]
+            if nav
+        ]
+        return f"<nav class='pager'>{''.join(links)}</nav>" if links else ""
+
+    def page(
+        self,
+        relative_path: str,
+        *,
+        title: str,
+        content: str,
+        description: str | None = None,
+        current: str | None = None,
+        pager: str = "",
+        head: str = "",
+    ) -> None:
+        """Write a page of the site.
+
+        :param relative_path: The path of the page in the site, e.g. `archive.html`.
+        :param title: The title of the page.
+        :param content: The HTML content of the page.
+        :param description: The meta description of the page.
+        :param current: The slug of the current document, highlighted in the sidebar.
+        :param pager: The HTML of the links to the previous and next pages.
+        :param head: Extra HTML for the `<head>` of the page, e.g. prefetch hints.
+        """
+        page = _page_template().substitute(
+            title=html.escape(title),
+            description=html.escape(description or ""),
+            stylesheet=self.asset(TEMPLATES_PATH / "site.css"),
+            head=head,
+            home=f"/{self.site.items[0].slug}" if self.site.items else "/",
+            year=self.year,
+            sidebar=self._sidebar(current),
+            content=content,
+            pager=pager,
+        )
+        self._write(relative_path, page.encode("utf-8"))
+
+    def _image_urls(self, text: str) -> str:
+        """Replace the URLs of the images of the build folder with the URLs of their hashed assets."""
+        return IMAGE_URL_REGEX.sub(
+            lambda match: f"{match.group(1)}='{self.asset(self.build_path / 'images' / match.group(2))}'", text
+        )
+
+    def article(self, item) -> None:
+        """Write the page of a document, with its images (and the prefetched ones) as hashed assets."""
+        document = item.document
+        entry = self.site[item.slug]
+        content = self._image_urls(HtmlTransformer(document).get_html(with_hints=False))
+        header = f"<p><a class='download' href='/pdf/{item.slug}.pdf' target='_blank'>Download PDF</a></p>"
+
+        if document.authors:
+            authors = ", ".join(html.escape(author.name) for author in document.authors)
+            header = f"<p class='authors'>{authors}</p>\n{header}"
+
+        self.page(
+            f"{item.slug}.html",
+            title=item.title,
+            content=f"{header}\n{content}",
+            description=document.description,
+            current=item.slug,
+            pager=self._pager(entry),
+            head=self._image_urls(HtmlTransformer._hints_to_html(document)),
+        )
+
+    def section_index(self, section) -> None:
+        """Write the index page of a section, listing its documents."""
+        items = "".join(f"<li><a href='/{item.slug}'>{html.escape(item.title)}</a></li>" for item in section.items)
+        self.page(
+            f"{slugify(section.text)}.html",
+            title=section.text,
+            content=f"<h1>{html.escape(section.text)}</h1>\n<ul>{items}</ul>",
+        )
+
+    def markdown_page(self, relative_path: str, markdown_path: Path, *, title: str, extra: str = "") -> None:
+        """Write a page from a markdown file of the Vision folder, ignoring its Vitepress frontmatter."""
+        _, text = read_markdown(markdown_path)
+        content = markdown2.markdown(text) if text.strip() else ""
+        self.page(relative_path, title=title, content=content + extra)
+
+    @staticmethod
+    def _hero(hero: dict) -> str:
+        # like Vitepress, the texts may contain HTML
+        parts = [
+            f"<{tag} class='{name}'>{hero[name]}</{tag}>"
+            for tag, name in [("h1", "name"), ("p", "text"), ("p", "tagline")]
+            if hero.get(name)
+        ]
+        actions = "".join(
+            f"<a class='action {html.escape(action.get('theme', 'brand'))}' href='{html.escape(action['link'])}'>"
+            f"{html.escape(action['text'])}</a>"
+            for action in hero.get("actions") or []
+        )
+        if actions:
+            parts.append(f"<div class='actions'>{actions}</div>")
+
+        image = hero.get("image")
+        if isinstance(image, str):
+            image = {"src": image}
+        if isinstance(image, dict) and image.get("src"):
+            parts.append(f"<img src='{html.escape(image['src'])}' alt='{html.escape(image.get('alt', ''))}' />")
+
+        return f"<section class='hero'>{''.join(parts)}</section>\n" if parts else ""
+
+    @staticmethod
+    def _features(features: list[dict]) -> str:
+        items = []
+
+        for feature in features:
+            body = f"<h2>{feature.get('title', '')}</h2><p>{feature.get('details', '')}</p>"
+            if feature.get("link"):
+                items.append(f"<a class='feature' href='{html.escape(feature['link'])}'>{body}</a>")
+            else:
+                items.append(f"<div class='feature'>{body}</div>")
+
+        return f"<section class='features'>{''.join(items)}</section>\n" if items else ""
+
+    def home(self, markdown_path: Path, *, title: str, extra: str = "") -> None:
+        """Write the home page from the `index.md` file of the Vision folder.
+
+        The file uses the home layout of Vitepress: the hero and the features are rendered from its frontmatter,
+        followed by its content.
+        """
+        frontmatter, text = read_markdown(markdown_path)
+        content = self._hero(frontmatter.get("hero") or {}) + self._features(frontmatter.get("features") or [])
+        content += markdown2.markdown(text) if text.strip() else ""
+        self.page("index.html", title=title, content=content + extra)
+
+    def remove_stale_files(self) -> list[str]:
+        """Remove the files written by the previous run that are no longer part of the site.
+
+        Only files listed in the state file are removed, so other files in the output folder are left untouched.
+
+        :returns: The removed files.
+        """
+        state_path = self.html_path / STATE_FILE
+
+        try:
+            with open(state_path) as f:
+                previous_files = set(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            previous_files = set()
+
+        removed = sorted(previous_files - self.files)
+        for relative_path in removed:
+            (self.html_path / relative_path).unlink(missing_ok=True)
+
+        write_if_changed(state_path, json.dumps(sorted(self.files), indent=2).encode())
+        return removed
+
+
+def generate_static_site(tree, site: SiteManifest, html_path: Path, *, build_path: Path, public_path: Path, year: str):
+    """Write the static HTML site: document pages, section indexes, home, archive and 404 pages, and public files.
+
+    :param tree: The tree structure containing sections and items.
+    :param site: The site manifest.
+    :param html_path: The output folder, e.g. `/app/html`.
+    :param build_path: The build folder, with the images and the `index.md` and `archive.md` pages.
+    :param public_path: The public folder, copied to the root of the site.
+    :param year: The Vision year.
+    :returns: The files that were written or removed.
+    """
+    static_site = StaticSite(site, html_path, build_path=build_path, year=year)
+    static_site.copy_public(public_path)
+
+    for section in tree:
+        for item in section["items"]:
+            static_site.article(item)
+
+    sections = ""
+    for section in site.sections:
+        static_site.section_index(section)
+        sections += f"<li><a href='/{slugify(section.text)}'>{html.escape(section.text)}</a></li>"
+
+    static_site.home(build_path / "index.md", title=f"HiPEAC Vision {year}", extra=f"\n<ul>{sections}</ul>")
+    static_site.markdown_page("archive.html", build_path / "archive.md", title="Archive")
+    static_site.page("404.html", title="Page not found", content="<h1>Page not found</h1>")
+
+    return static_site.changed + static_site.remove_stale_files()
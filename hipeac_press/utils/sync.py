@@ -0,0 +1,112 @@
+import os
+import shutil
+from pathlib import Path
+
+from .build_manifest import hash_file
+
+
+def _needs_copy(entry: os.DirEntry | Path, target: Path, checksum: bool) -> bool:
+    """Check if a source file differs from its copy, by size and modification time or by checksum."""
+    try:
+        target_stat = target.stat()
+    except FileNotFoundError:
+        return True
+
+    source_stat = entry.stat()
+
+    if source_stat.st_size != target_stat.st_size:
+        return True
+    if checksum:
+        return hash_file(Path(entry)) != hash_file(target)
+    return source_stat.st_mtime_ns != target_stat.st_mtime_ns
+
+
+def copy_file(source: Path, target: Path, *, checksum: bool = False) -> bool:
+    """Copy a file, only if it is new or changed.
+
+    :param source: The file to copy.
+    :param target: The path of the copy.
+    :param checksum: Compare file contents instead of modification times when sizes are equal.
+    :returns: True if the file was copied.
+    """
+    if not _needs_copy(source, target, checksum):
+        return False
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, target)
+    return True
+
+
+def mirror(source: Path, destination: Path, *, checksum: bool = False) -> list[Path]:
+    """Mirror a folder, copying only new or changed files and removing the ones that no longer exist.
+
+    Like `cp -r source/* destination`, hidden files at the top level of the source are not copied.
+
+    :param source: The folder to copy, e.g. the network-mounted Vision folder.
+    :param destination: The local copy.
+    :param checksum: Compare file contents instead of modification times when sizes are equal.
+    :returns: The relative paths of the copied files.
+    """
+    copied = []
+    expected = set()
+
+    def walk(folder: Path, relative: Path):
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not relative.parts and entry.name.startswith("."):
+                    continue
+
+                entry_relative = relative / entry.name
+                expected.add(entry_relative)
+
+                if entry.is_dir():
+                    walk(Path(entry.path), entry_relative)
+                elif entry.is_file() and _needs_copy(entry, destination / entry_relative, checksum):
+                    (destination / entry_relative).parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(entry.path, destination / entry_relative)
+                    copied.append(entry_relative)
+
+    destination.mkdir(parents=True, exist_ok=True)
+    walk(source, Path())
+
+    # children are sorted after their parents, so folders are empty when they are removed
+    for path in sorted(destination.rglob("*"), reverse=True):
+        if path.relative_to(destination) not in expected:
+            if path.is_dir() and not path.is_symlink():
+                path.rmdir()
+            else:
+                path.unlink()
+
+    return copied
+
+
+def write_errors(errors: list[str], path: Path, *, mirror_path: Path | None = None) -> bool:
+    """Write an errors file, only touching it if its content changes. The file is removed if there are no errors.
+
+    :param errors: The error messages.
+    :param path: The path of the errors file, e.g. in the network-mounted Vision folder.
+    :param mirror_path: The path of the same file in a local mirror, read instead of `path` and kept up to date.
+    :returns: True if the errors file was written or removed.
+    """
+    content = "\n".join(errors) if errors else None
+
+    try:
+        with open(mirror_path or path) as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+
+    if content == current:
+        return False
+
+    for file in [path, mirror_path] if mirror_path else [path]:
+        if content is None:
+            file.unlink(missing_ok=True)
+        else:
+            with open(file, "w") as f:
+                f.write(content)
+
+    if mirror_path and content is not None:
+        shutil.copystat(path, mirror_path)
+
+    return True
@@ -0,0 +1,106 @@
+import os
+import time
+from pathlib import Path
+
+from ..transformers import get_transformer
+from ..type_definitions import Document
+from .memory import watch_rss
+from .processes import preload, process_context
+
+
+# seconds between two checks of the memory used by a rendering
+POLL_INTERVAL = 0.2
+
+# every rendering is a child process, forked from a fork server that has already imported WeasyPrint
+preload("hipeac_press.transformers.preload")
+
+
+def _render(connection, transformer_class, document: Document, path: Path, kwargs: dict):
+    """Render a document into a file. This runs in a child process, so it can be stopped if it overruns its budget."""
+    try:
+        with open(path, "wb") as f:
+            transformer_class.from_kwargs(document, **kwargs).write(f, **kwargs)
+
+        connection.send(None)
+    except MemoryError:
+        connection.send("PDF rendering ran out of memory")
+    except Exception as e:
+        connection.send(f"PDF rendering failed: {e}")
+
+
+def render_with_watchdog(
+    item,
+    path: Path,
+    *,
+    format: str = "pdf",
+    timeout: float | None = None,
+    memory_limit: int | None = None,
+    **kwargs,
+) -> float:
+    """Render a document in a child process with a time and memory budget.
+
+    If the child fails or overruns its budget, it is stopped, the error is added to `item.errors` and the output file
+    is removed, so the rest of the build can continue without it.
+
+    :param item: The DocxConverter to render.
+    :param path: The path of the output file.
+    :param format: The output format.
+    :param timeout: The maximum number of seconds the rendering can take. No limit if None.
+    :param memory_limit: The maximum resident set size of the child process, in bytes, checked by polling it from
+        this process (only where `/proc` is available). No limit if None.
+    :returns: The number of seconds the rendering took.
+    """
+    transformer_class = get_transformer(format)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    context = process_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_render, args=(sender, transformer_class, item.document, tmp_path, kwargs))
+
+    start = time.perf_counter()
+    process.start()
+    sender.close()
+
+    while True:
+        left = None if timeout is None else timeout - (time.perf_counter() - start)
+
+        if receiver.poll(POLL_INTERVAL if left is None else max(0.0, min(POLL_INTERVAL, left))):
+            try:
+                error = receiver.recv()
+            except EOFError:
+                error = "PDF rendering process exited unexpectedly"
+            break
+
+        rss = watch_rss(process.pid)
+        if memory_limit and rss and rss > memory_limit:
+            error = f"PDF rendering used more than {memory_limit // 2**20} MB of memory and was stopped"
+            break
+
+        if left is not None and left <= 0:
+            error = f"PDF rendering took more than {timeout} seconds and was stopped"
+            break
+
+    if error is not None and process.is_alive():
+        process.kill()
+
+    process.join()
+    seconds = time.perf_counter() - start
+
+    if error is None:
+        os.replace(tmp_path, path)
+    else:
+        tmp_path.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        item.errors.append(error)
+
+    return seconds
+
+
+def slowest_report(timings: dict[str, float], n: int = 10) -> str:
+    """Return a report of the slowest renderings.
+
+    :param timings: Seconds per rendered document, by slug.
+    :param n: The number of documents to include.
+    :returns: The report, one document per line.
+    """
+    lines = [f"{seconds:8.2f}s  {slug}" for slug, seconds in sorted(timings.items(), key=lambda x: -x[1])[:n]]
+    return "\n".join([f"Slowest {len(lines)} of {len(timings)} renderings:", *lines])
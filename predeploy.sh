@@ -1,7 +1,41 @@
 #!/bin/bash
+set -euo pipefail
 
-# Run Python build
-poetry run python3 build.py
+# Previous build, kept in the mounted storage
+BUILD_STORAGE_PATH="${BUILD_STORAGE_PATH:-/app/storage/build}"
 
-# Run Yarn build
-yarn build
+# Write the HTML site with Python instead of Vitepress, only rewriting the pages that changed
+BUILD_STATIC_SITE="${BUILD_STATIC_SITE:-}"
+if [ "$BUILD_STATIC_SITE" = "1" ]; then
+  export BUILD_HTML_PATH=html
+  if [ -d "$BUILD_STORAGE_PATH/html" ]; then
+    rm -rf html && cp -rp "$BUILD_STORAGE_PATH/html" html
+  fi
+fi
+
+# Run Python build, unless sources, press code and settings are the same as in the previous build (and, for the
+# static site, its HTML was stored too)
+if [ -d "$BUILD_STORAGE_PATH/.build" ] && \
+  { [ "$BUILD_STATIC_SITE" != "1" ] || [ -d "$BUILD_STORAGE_PATH/html" ]; } && \
+  poetry run python3 -m hipeac_press.utils.build_manifest "$BUILD_STORAGE_PATH/.build/manifest.json"; then
+  echo "Inputs unchanged, reusing the previous build"
+  rm -rf .build && cp -r "$BUILD_STORAGE_PATH/.build" .build
+else
+  poetry run python3 build.py
+
+  # Replace the stored build only once the new one is complete
+  rm -rf "$BUILD_STORAGE_PATH.new" && mkdir -p "$BUILD_STORAGE_PATH.new"
+  cp -r .build "$BUILD_STORAGE_PATH.new/.build"
+  if [ "$BUILD_STATIC_SITE" = "1" ]; then
+    cp -rp html "$BUILD_STORAGE_PATH.new/html"
+  fi
+  rm -rf "$BUILD_STORAGE_PATH" && mv "$BUILD_STORAGE_PATH.new" "$BUILD_STORAGE_PATH"
+fi
+
+# Run Yarn build, unless the HTML site was written by the Python build
+if [ "$BUILD_STATIC_SITE" != "1" ]; then
+  yarn build
+fi
+
+# Precompress static files for nginx gzip_static
+poetry run python3 -m hipeac_press.utils.compress html
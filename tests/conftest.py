@@ -0,0 +1,55 @@
+import gc
+import time
+from collections.abc import Callable
+
+import pytest
+
+
+class Scaling:
+    """Measure how the run time of a case grows with its input size, to check that the case scales linearly.
+
+    The time covers all the work of the case: regular expressions, markdown2, string operations... Linear code takes
+    about `factor` times longer when its input grows `factor` times, quadratic code about `factor ** 2` times. Every
+    case runs several times with the garbage collector off and the fastest run is kept, so a loaded machine slows
+    down single runs without changing the ratio much.
+
+    :param min_time: The minimum total time, in seconds, to spend running every input size.
+    :param min_runs: The minimum number of runs of every input size.
+    """
+
+    def __init__(self, min_time: float = 0.1, min_runs: int = 3):
+        self.min_time = min_time
+        self.min_runs = min_runs
+
+    def best_time(self, func: Callable[[], object]) -> float:
+        """Return the time of the fastest run of a function, in seconds."""
+        times = []
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            while len(times) < self.min_runs or sum(times) < self.min_time:
+                start = time.perf_counter()
+                func()
+                times.append(time.perf_counter() - start)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        return min(times)
+
+    def growth(self, setup: Callable[[int], Callable[[], object]], n: int, factor: int = 4) -> float:
+        """Return how many times longer a case takes when its input grows `factor` times.
+
+        :param setup: A function preparing the case for an input size, and returning the function to measure.
+        :param n: The smallest input size.
+        :param factor: The growth of the input size.
+        """
+        small, large = (self.best_time(setup(size)) for size in [n, n * factor])
+        return large / small
+
+
+@pytest.fixture
+def scaling() -> Scaling:
+    """Return a measure of how the run time of a case grows with its input size, see `Scaling`."""
+    return Scaling()
@@ -0,0 +1,71 @@
+import re
+
+from hipeac_press.utils.build_manifest import (
+    PARENT,
+    SETTINGS,
+    create_inputs_manifest,
+    diff_hashes,
+    diff_outputs,
+    hash_files,
+)
+
+
+# settings that change how the build runs, but not its outputs
+RUNTIME_SETTINGS = {
+    "VISION_SOURCE_PATH",  # the sources are hashed
+    "BUILD_CACHE_PATH",
+    "BUILD_MEMORY_BUDGET",
+    "BUILD_WORKER_MEMORY",
+    "BUILD_WORKERS",
+    "BUILD_RENDER_TIMEOUT",
+    "BUILD_RENDER_MEMORY",
+    "BUILD_PREFLIGHT",
+    "BUILD_STAGE_WORKERS",
+    "BUILD_MIRROR_CHECKSUM",
+    "BUILD_STORAGE_PATH",
+}
+
+
+def test_hash_files_skips_hidden_and_generated_files(tmp_path):
+    (tmp_path / "article").mkdir()
+    (tmp_path / "article" / "article.docx").write_bytes(b"docx")
+    (tmp_path / "article" / "errors.txt").write_text("errors")
+    (tmp_path / "article" / "~$article.docx").write_bytes(b"lock")
+    (tmp_path / ".DS_Store").write_bytes(b"")
+
+    assert list(hash_files(tmp_path)) == ["article/article.docx"]
+
+
+def test_diff_hashes():
+    old = {"a": "1", "b": "2", "c": "3"}
+    new = {"b": "2", "c": "4", "d": "5"}
+
+    assert diff_hashes(old, new) == {"added": ["d"], "changed": ["c"], "removed": ["a"]}
+
+
+def test_diff_outputs_without_previous_manifest():
+    manifest = {"outputs": {"build": {"a": "1"}}}
+
+    assert diff_outputs(None, manifest) == {"build": {"added": ["a"], "changed": [], "removed": []}}
+
+
+def test_inputs_manifest_includes_settings(tmp_path, monkeypatch):
+    (tmp_path / "index.md").write_text("# Vision")
+    monkeypatch.delenv("BUILD_PROFILE", raising=False)
+    final = create_inputs_manifest(tmp_path)
+    monkeypatch.setenv("BUILD_PROFILE", "draft")
+    draft = create_inputs_manifest(tmp_path)
+
+    assert final["source"] == draft["source"]
+    assert final["settings"]["BUILD_PROFILE"] is None
+    assert draft["settings"]["BUILD_PROFILE"] == "draft"
+    assert final != draft
+
+
+def test_settings_cover_every_build_variable():
+    variables = set()
+    for path, regex in [("build.py", r"os\.environ\.get\(\"(\w+)\""), ("predeploy.sh", r"\$\{(\w+)")]:
+        variables.update(re.findall(regex, (PARENT / path).read_text()))
+
+    assert "BUILD_PROFILE" in variables
+    assert variables - RUNTIME_SETTINGS == set(SETTINGS)
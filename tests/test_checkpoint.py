@@ -0,0 +1,41 @@
+from hipeac_press.utils.checkpoint import Checkpoints, hash_values
+
+
+def test_hash_values():
+    assert hash_values("a", 1, {"b": 2}) == hash_values("a", 1, {"b": 2})
+    assert hash_values("a", 1) != hash_values("a", 2)
+
+
+def test_checkpoints_are_reused_only_when_resuming(tmp_path):
+    output = tmp_path / "article.pdf"
+    output.write_bytes(b"pdf")
+    Checkpoints(tmp_path / "checkpoints.json").record("pdf/article", "inputs", [output], value=12)
+
+    assert Checkpoints(tmp_path / "checkpoints.json").get("pdf/article", "inputs") is None
+
+    checkpoints = Checkpoints(tmp_path / "checkpoints.json", resume=True)
+    assert checkpoints.get("pdf/article", "inputs") == 12
+    assert checkpoints.skipped == {"pdf/article"}
+
+
+def test_checkpoints_are_invalidated_by_inputs_and_outputs(tmp_path):
+    output = tmp_path / "article.pdf"
+    output.write_bytes(b"pdf")
+    Checkpoints(tmp_path / "checkpoints.json").record("pdf/article", "inputs", [output])
+    checkpoints = Checkpoints(tmp_path / "checkpoints.json", resume=True)
+
+    assert checkpoints.get("pdf/article", "other inputs") is None
+    assert checkpoints.get("pdf/other", "inputs") is None
+
+    output.write_bytes(b"stamped pdf")
+    assert checkpoints.get("pdf/article", "inputs") is None
+
+    output.unlink()
+    assert checkpoints.get("pdf/article", "inputs") is None
+    assert checkpoints.skipped == set()
+
+
+def test_corrupt_checkpoints_file(tmp_path):
+    (tmp_path / "checkpoints.json").write_text("{")
+
+    assert Checkpoints(tmp_path / "checkpoints.json", resume=True).get("pdf/article", "inputs") is None
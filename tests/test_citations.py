@@ -0,0 +1,193 @@
+import random
+import re
+from datetime import UTC, datetime
+
+import pytest
+
+from hipeac_press.citations import (
+    BRACKETS_REGEX,
+    CitationResolver,
+    _citations_end,
+    _to_footnote,
+    parse_reference,
+    reference_ids,
+    split_citation,
+    to_footnotes,
+)
+from hipeac_press.transformers.html import HtmlTransformer
+from hipeac_press.transformers.markdown import MarkdownTransformer
+from hipeac_press.type_definitions import BulletList, Document, Image, Paragraph, Reference
+
+
+BRACKETS_REGEX_BEFORE = re.compile(r"\[([^\]]+)\]")
+
+
+def _to_footnotes_before(text: str) -> str:
+    """Convert citations like `to_footnotes` did before the scan stopped at the last closing bracket."""
+    return BRACKETS_REGEX_BEFORE.sub(_to_footnote, text)
+
+
+def _highlight_before(codes: list[str], text: str) -> str:
+    """Highlight citations like `CitationResolver.highlight` did with an alternation of the reference codes."""
+    alternatives = "|".join(re.escape(code) for code in sorted(codes, key=len, reverse=True))
+    return re.sub(rf"\[({alternatives})\]", lambda match: f"<samp>{match.group(0)}</samp>", text)
+
+
+def test_split_citation():
+    assert split_citation("1") == ["1"]
+    assert split_citation("a, b,c") == ["a", "b", "c"]
+    assert split_citation("1,") == ["1,"]
+
+
+def test_parse_reference():
+    assert parse_reference("[R1] Some paper, 2024") == Reference(code="R1", text="Some paper, 2024")
+
+    with pytest.raises(IndexError):
+        parse_reference("R1 without brackets")
+
+
+def test_to_footnotes():
+    assert to_footnotes("See [1] and [a, b].") == "See [^1] and [^a][^b]."
+    assert to_footnotes("Already [^1], [!alt] and [unclosed") == "Already [^1], [!alt] and [unclosed"
+
+
+def test_highlight():
+    resolver = CitationResolver([Reference(code="R1", text="x"), Reference(code="R10", text="y")])
+
+    assert resolver.highlight("[R1] [R10] [R2]") == "<samp>[R1]</samp> <samp>[R10]</samp> [R2]"
+    assert resolver.highlight("[R1]", "sup", href="refs.html") == "<a href='refs.html#ref-r1'><sup>[R1]</sup></a>"
+    assert resolver.highlight("[x [R1] [[R10]] [R1, R10]") == "[x <samp>[R1]</samp> [<samp>[R10]</samp>] [R1, R10]"
+    assert CitationResolver([]).highlight("[R1]") == "[R1]"
+
+
+def test_reference_ids_are_unique():
+    references = [Reference(code=code, text="x") for code in ["A.1", "A1", "a1", "B", "A.1"]]
+    html = HtmlTransformer(_document([Paragraph(text="[A.1] [A1] [a1]")], 0, references)).get_html(
+        link_citations="refs.html"
+    )
+
+    assert reference_ids(references) == {"A.1": "ref-a1", "A1": "ref-a1-1", "a1": "ref-a1-2", "B": "ref-b"}
+    assert "<a href='refs.html#ref-a1-1'><samp>[A1]</samp></a>" in html
+    assert "<li id='ref-a1-2'><samp>a1:</samp>" in html
+
+
+def test_check():
+    resolver = CitationResolver([Reference(code=code, text="x") for code in ["a", "b", "c", "d"]])
+    elements = [
+        Paragraph(text="Cites [a] and [x, b]."),
+        BulletList(items=["Cites [c]"]),
+        Image(path="image.png", caption="Cites [y] [x]"),
+    ]
+
+    assert resolver.check(elements) == [
+        "Citation without reference: [x]",
+        "Citation without reference: [y]",
+        "Reference never cited: [d]",
+    ]
+
+
+def _random_texts(n: int) -> list[str]:
+    tokens = ["[", "]", "[a]", ",", " ", "^", "!", "a", "b", "x y", "**"]
+    rng = random.Random(0)
+    return ["".join(rng.choice(tokens) for _ in range(rng.randint(0, 14))) for _ in range(n)]
+
+
+def test_citations_match_previous_implementation():
+    codes = ["a", "b", "x y", "a, b", "^a"]
+    resolver = CitationResolver([Reference(code=code, text="x") for code in codes])
+
+    for text in [*_random_texts(5000), "[a] [b, c] [unclosed", "[[x] [y]] [", "]][[", "[a " * 50]:
+        assert to_footnotes(text) == _to_footnotes_before(text), text
+        assert resolver.highlight(text) == _highlight_before(codes, text), text
+        assert [m.group(0) for m in BRACKETS_REGEX.finditer(text, 0, _citations_end(text))] == [
+            m.group(0) for m in BRACKETS_REGEX_BEFORE.finditer(text)
+        ], text
+
+
+def _brackets(n: int):
+    """Find the citations of a text full of brackets: citations, lists of codes, unclosed and nested brackets."""
+    resolver = CitationResolver([Reference(code=f"R{i}", text="x") for i in range(100)])
+    text = " ".join(f"[R{i % 100}] [R1, R2] [ [[x] [unclosed (see [5]" for i in range(n))
+    return lambda: (to_footnotes(text), resolver.highlight(text), resolver.check([Paragraph(text=text)]))
+
+
+def _unclosed_brackets(n: int):
+    """Find the citations of a text with many opening brackets and no closing one."""
+    resolver = CitationResolver([Reference(code="R1", text="x")])
+    text = "[a " * n
+    return lambda: (to_footnotes(text), resolver.highlight(text), resolver.check([Paragraph(text=text)]))
+
+
+def _many_references(n: int):
+    """Highlight and convert to footnotes the citations of a text citing every one of `n` references."""
+    resolver = CitationResolver([Reference(code=f"R{i}", text="x") for i in range(n)])
+    text = " ".join(f"see [R{i}] and [R{i}, R{i + 1}]" for i in range(n))
+    return lambda: (resolver.highlight(text, href="refs.html"), to_footnotes(text))
+
+
+def _many_references_before(n: int):
+    """Highlight the citations of a text citing every one of `n` references, matching all codes at every bracket."""
+    codes = [f"R{i}" for i in range(n)]
+    text = " ".join(f"see [R{i}] and [R{i}, R{i + 1}]" for i in range(n))
+    return lambda: _highlight_before(codes, text)
+
+
+def _document(elements: list[Paragraph], n: int, references: list[Reference] | None = None) -> Document:
+    return Document(
+        slug="article",
+        title="Article",
+        elements=elements,
+        references=references
+        or [Reference(code=f"R{i}", text=f"Reference {i} https://example.org/{i}") for i in range(n)],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+
+
+def _references(n: int):
+    """Export a document with `n` references, every one cited, to markdown and HTML."""
+    document = _document([Paragraph(text=f"Text citing [R{i}] and [R{i}, R{i + 1}].") for i in range(n)], n + 1)
+    return lambda: (MarkdownTransformer(document).get(), HtmlTransformer(document).get_html())
+
+
+def _long_paragraph(n: int):
+    """Export a paragraph of `n` words with formatting, links and citations to markdown and HTML."""
+    text = " ".join(f"**word{i}** _w_ https://example.org/{i} [R{i % 10}]" for i in range(n))
+    document = _document([Paragraph(text=text)], 10)
+    return lambda: (MarkdownTransformer(document).get(), HtmlTransformer(document).get_html())
+
+
+@pytest.mark.parametrize(
+    ("setup", "n"),
+    [
+        (_brackets, 100),
+        (_unclosed_brackets, 5000),
+        (_many_references, 1000),
+        (_references, 50),
+        (_long_paragraph, 100),
+    ],
+)
+def test_citations_scale_linearly(scaling, setup, n):
+    assert scaling.growth(setup, n) <= 8
+
+
+def test_unclosed_brackets_are_left_unchanged():
+    text = "[a " * 1000
+    resolver = CitationResolver([Reference(code="R1", text="x")])
+
+    assert to_footnotes(text) == resolver.highlight(text) == text
+    assert resolver.check([Paragraph(text=text)]) == ["Reference never cited: [R1]"]
+
+
+@pytest.mark.parametrize(
+    ("setup", "n"),
+    [(lambda n: lambda: _to_footnotes_before("[a " * n), 1000), (_many_references_before, 500)],
+)
+def test_timings_tell_quadratic_citations_apart(scaling, setup, n):
+    assert scaling.growth(setup, n) > 10
+
+
+def test_references_are_all_cited():
+    markdown, html = _references(200)()
+
+    assert all(f"[^R{i}]" in markdown.decode() for i in range(201))
+    assert all(f"<samp>[R{i}]</samp>" in html for i in range(200))
@@ -0,0 +1,61 @@
+import gzip
+
+import pytest
+
+from hipeac_press.utils.compress import MIN_SIZE, precompress
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<p>hello</p>" * 100)
+    (tmp_path / "assets" / "app.js").write_text("console.log(1);" * 100)
+    (tmp_path / "small.css").write_text("a{}")
+    (tmp_path / "cover.jpg").write_bytes(b"\xff" * 1000)
+    return tmp_path
+
+
+def test_fresh_sources_are_compressed(site):
+    assert precompress(site) == 2
+    assert gzip.decompress((site / "index.html.gz").read_bytes()) == (site / "index.html").read_bytes()
+    assert (site / "assets" / "app.js.gz").exists()
+    assert not (site / "small.css.gz").exists()
+    assert not (site / "cover.jpg.gz").exists()
+
+
+def test_unchanged_sources_are_skipped(site):
+    precompress(site)
+    assert precompress(site) == 0
+
+    (site / "index.html").write_text("<p>changed</p>" * 100)
+    assert precompress(site) == 1
+    assert gzip.decompress((site / "index.html.gz").read_bytes()).startswith(b"<p>changed</p>")
+
+
+def test_siblings_of_shrunk_sources_are_removed(site):
+    precompress(site)
+    (site / "index.html").write_text("x" * (MIN_SIZE - 1))
+
+    assert precompress(site) == 0
+    assert not (site / "index.html.gz").exists()
+    assert (site / "assets" / "app.js.gz").exists()
+
+
+def test_siblings_of_deleted_sources_are_removed(site):
+    precompress(site)
+    (site / "assets" / "app.js").unlink()
+
+    precompress(site)
+    assert not (site / "assets" / "app.js.gz").exists()
+    assert (site / "index.html.gz").exists()
+
+
+def test_brotli_siblings_are_removed_without_brotli(site):
+    pytest.importorskip("brotli")
+
+    assert precompress(site, with_brotli=True) == 4
+    assert (site / "index.html.br").exists()
+
+    assert precompress(site) == 0
+    assert not (site / "index.html.br").exists()
+    assert (site / "index.html.gz").exists()
@@ -0,0 +1,118 @@
+import random
+import re
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from docx import Document as DocxDocument
+
+from hipeac_press.docx import DocxConverter
+from hipeac_press.type_definitions import Document, NavItem, Paragraph
+
+
+def _consolidate_formatting_before(text: str) -> str:
+    """Consolidate formatting like `_consolidate_formatting` did before bold chains were merged at once."""
+    text = re.sub(r"\*\*([^*]+)\*\*\*\*([^*]+)\*\*", r"**\1\2**", text)
+    text = re.sub(r"_([^_]+)__([^_]+)_", r"_\1\2_", text)
+
+    while True:
+        match = re.search(r"\*\*[^*]+\*\*\*\*[^*]+\*\*", text)
+        if not match:
+            break
+        section = match.group(0)
+        content = re.findall(r"\*\*([^*]+)\*\*", section)
+        text = text.replace(section, f"**{''.join(content)}**")
+
+    text = re.sub(r"\*\*\s*([^*]+?)\s*\*\*", r"**\1**", text)
+    text = re.sub(r"_\s*([^_]+?)\s*_", r"_\1_", text)
+    return text
+
+
+def _converter(slug: str = "article") -> DocxConverter:
+    document = Document(
+        slug=slug,
+        title="Article",
+        elements=[Paragraph(text="Text.")],
+        references=[],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    return DocxConverter.from_document(Path(f"{slug}.docx"), document, img_folder=Path("images"), section_name="s")
+
+
+def test_spilled_converter_exports_the_document(tmp_path):
+    converter = _converter()
+    markdown = converter.export(format="md")
+    converter.spill(tmp_path)
+
+    assert converter._document is None
+    assert converter.title == "Article"
+    assert converter.export(format="md") == markdown
+
+
+def test_spilled_converter_is_read_only(tmp_path):
+    converter = _converter()
+    converter.spill(tmp_path)
+
+    with pytest.raises(RuntimeError, match="spilled"):
+        converter.set_next(NavItem(text="Next", link="/next"))
+    with pytest.raises(RuntimeError, match="spilled"):
+        converter.add_element(Paragraph(text="More."))
+
+    assert converter.document.next is None
+    assert len(converter.document.elements) == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "**a****b**",
+        "**a****b****c** and **d****e**",
+        "** a ****b **",
+        "**a****b** **a****b**",
+        "***a****b***",
+        "_a__b_ **a*****b**",
+        "".join(f"**w{i}**" for i in range(200)),
+    ],
+)
+def test_consolidate_formatting_matches_previous_implementation(text):
+    assert DocxConverter.__new__(DocxConverter)._consolidate_formatting(text) == _consolidate_formatting_before(text)
+
+
+def test_consolidate_formatting_matches_previous_implementation_on_random_texts():
+    consolidate = DocxConverter.__new__(DocxConverter)._consolidate_formatting
+    tokens = ["**", "*", "_", "__", "a", "b", " ", "***"]
+    rng = random.Random(0)
+
+    for _ in range(5000):
+        text = "".join(rng.choice(tokens) for _ in range(rng.randint(0, 14)))
+        assert consolidate(text) == _consolidate_formatting_before(text), text
+
+
+def _bold_runs_text(consolidate):
+    """Return the setup of a case consolidating `n` adjacent bold sections, as left by runs split by Word."""
+    return lambda n: lambda: consolidate("".join(f"**w{i}**" for i in range(n)))
+
+
+def test_bold_runs_scale_linearly(scaling):
+    assert scaling.growth(_bold_runs_text(DocxConverter.__new__(DocxConverter)._consolidate_formatting), 200) <= 8
+
+    # the timings tell a quadratic implementation apart
+    assert scaling.growth(_bold_runs_text(_consolidate_formatting_before), 1000) > 10
+
+
+def test_bold_runs_docx_scale_linearly(tmp_path, scaling):
+    def setup(n: int):
+        docx_path = tmp_path / f"bold-runs-{n}.docx"
+        document = DocxDocument()
+        document.core_properties.title = "Bold runs"
+        paragraph = document.add_paragraph()
+
+        for i in range(n):
+            run = paragraph.add_run(f"word{i} ")
+            run.bold = i % 3 != 2
+            run.italic = i % 3 == 2
+
+        document.save(docx_path)
+        return lambda: DocxConverter(docx_path, img_folder=tmp_path / "images")
+
+    assert scaling.growth(setup, 100) <= 8
@@ -0,0 +1,78 @@
+import json
+from datetime import UTC, datetime
+
+import pytest
+from docx import Document as DocxDocument
+from PIL import Image
+
+from hipeac_press.reader import Reader
+from hipeac_press.type_definitions import Document, Header, Paragraph
+from hipeac_press.utils.epub import _split_at_h2, generate_epub
+
+
+def _document(elements: list) -> Document:
+    return Document(slug="article", title="Article", elements=elements, updated_at=datetime(2025, 1, 1, tzinfo=UTC))
+
+
+def test_split_at_h2():
+    intro, first, second = Paragraph(text="Intro."), Paragraph(text="First."), Paragraph(text="Second.")
+    sub = Header(level=3, text="Sub")
+    document = _document([intro, Header(level=2, text="One"), first, sub, Header(level=2, text="Two"), second])
+
+    assert _split_at_h2(document) == [
+        (None, [intro]),
+        ("One", [first, sub]),
+        ("Two", [second]),
+    ]
+
+
+def test_split_at_h2_starting_with_a_header():
+    first, second = Paragraph(text="First."), Paragraph(text="Second.")
+    document = _document([Header(level=2, text="One"), first, Header(level=2, text="Two"), second])
+
+    assert _split_at_h2(document) == [(None, [Header(level=2, text="One"), first]), ("Two", [second])]
+
+
+def test_split_at_h2_without_headers():
+    paragraph = Paragraph(text="Text.")
+
+    assert _split_at_h2(_document([paragraph])) == [(None, [paragraph])]
+
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / "source" / "01 Chapters" / "article"
+    folder.mkdir(parents=True)
+    Image.new("RGB", (40, 30), "red").save(tmp_path / "image.png")
+
+    document = DocxDocument()
+    document.add_heading("Article", 1)
+    document.add_paragraph("Some **text** citing [R1] and [R1, R2].")
+    document.add_heading("Details", 2)
+    document.add_paragraph("An item", style="List Bullet")
+    document.add_picture(str(tmp_path / "image.png"))
+    document.add_paragraph("A caption", style="Caption")
+    document.add_heading("More", 2)
+    document.add_paragraph("More text.")
+    document.add_paragraph("References")
+    document.add_paragraph("[R1] A paper https://example.org/1")
+    document.add_paragraph("[R2] Another paper")
+    document.save(folder / "Article.docx")
+    (folder / "metadata.json").write_text(json.dumps({"title": "Article", "authors": ["A B"]}))
+
+    return tmp_path / "source"
+
+
+@pytest.mark.parametrize("split_chapters", [False, True])
+def test_outputs_are_reproducible(tmp_path, source, split_chapters):
+    build_path = tmp_path / "build"
+    build_path.mkdir()
+    Image.new("RGB", (60, 80), "blue").save(build_path / "cover.jpg")
+    outputs = []
+
+    for i in range(2):
+        tree = Reader(source, build_path / "images").tree
+        epub_file = generate_epub(tree, build_path, tmp_path / f"{i}.epub", split_chapters=split_chapters)
+        outputs.append((epub_file.read_bytes(), tree[0]["items"][0].export(format="md")))
+
+    assert outputs[0] == outputs[1]
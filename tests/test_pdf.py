@@ -0,0 +1,79 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from pypdf import PdfReader
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from hipeac_press.utils.pdf import concatenate_pdfs, split_sections
+
+
+def _pdf(path: Path, pages: list[int]) -> None:
+    """Write a PDF with a page for every number, showing a mark like `[201]` so pages can be told apart."""
+    c = canvas.Canvas(str(path), pagesize=A4)
+    for page in pages:
+        c.drawString(100, 400, f"[{page}]")
+        c.showPage()
+    c.save()
+
+
+def _pages(path: Path) -> list[int | None]:
+    """Return the marks of the pages of a PDF, None for blank pages."""
+    marks = []
+
+    for page in PdfReader(path).pages:
+        text = page.extract_text()
+        marks.append(int(text[text.index("[") + 1 : text.index("]")]) if "[" in text else None)
+
+    return marks
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    monkeypatch.chdir(Path(__file__).parents[1])  # the headers use the fonts of the public folder
+    articles = {"intro": [101], "first": [201, 202], "second": [301, 302, 303], "last": [401]}
+
+    for slug, pages in articles.items():
+        _pdf(tmp_path / f"{slug}.pdf", pages)
+    _pdf(tmp_path / "cover.pdf", [11])
+
+    tree = [
+        {"text": "Introduction", "items": [SimpleNamespace(slug="intro", title="Intro")]},
+        {"text": "Chapters", "items": [SimpleNamespace(slug=slug, title=slug) for slug in ["first", "second"]]},
+        {"text": "Missing PDFs", "items": [SimpleNamespace(slug="missing", title="Missing")]},
+        {"text": "Last", "items": [SimpleNamespace(slug="last", title="Last")]},
+    ]
+    return tree, tmp_path
+
+
+@pytest.mark.parametrize("low_memory", [False, True])
+def test_sections_get_the_pages_of_their_articles(book, low_memory):
+    if low_memory:
+        pytest.importorskip("pikepdf")
+
+    tree, pdf_path = book
+    ranges = concatenate_pdfs(tree, pdf_path, "2025", cover_pdf=pdf_path / "cover.pdf", low_memory=low_memory)
+
+    # articles with an odd number of pages are followed by a blank page
+    assert _pages(pdf_path / "hipeac-vision-2025.pdf") == [11, 101, None, 201, 202, 301, 302, 303, None, 401, None]
+    assert ranges == {"Introduction": (1, 3), "Chapters": (3, 9), "Last": (9, 11)}
+
+    file_names = split_sections(pdf_path, "2025", ranges, low_memory=low_memory)
+
+    assert file_names == {
+        "Introduction": "hipeac-vision-2025-introduction.pdf",
+        "Chapters": "hipeac-vision-2025-chapters.pdf",
+        "Last": "hipeac-vision-2025-last.pdf",
+    }
+    assert _pages(pdf_path / file_names["Introduction"]) == [101, None]
+    assert _pages(pdf_path / file_names["Chapters"]) == [201, 202, 301, 302, 303, None]
+    assert _pages(pdf_path / file_names["Last"]) == [401, None]
+
+
+def test_books_without_cover_start_at_the_first_page(book):
+    tree, pdf_path = book
+    ranges = concatenate_pdfs(tree[:1], pdf_path, "2025")
+
+    assert ranges == {"Introduction": (0, 2)}
+    assert _pages(pdf_path / split_sections(pdf_path, "2025", ranges)["Introduction"]) == [101, None]
@@ -0,0 +1,93 @@
+import os
+from datetime import UTC, datetime
+from io import BytesIO
+
+import pytest
+
+from hipeac_press.type_definitions import Document, Image, Paragraph
+
+
+try:
+    from hipeac_press.transformers import pdf
+except (ImportError, OSError):  # pragma: no cover, WeasyPrint needs Pango
+    pytest.skip("WeasyPrint cannot be loaded", allow_module_level=True)
+
+
+@pytest.fixture
+def renders(monkeypatch) -> list[str]:
+    """Replace WeasyPrint with a renderer writing the HTML, and return the list of rendered HTML."""
+    rendered = []
+
+    def render(self, html: str, target) -> None:
+        rendered.append(html)
+        target.write(f"{self.profile}:{html}".encode())
+
+    monkeypatch.setattr(pdf.PdfTransformer, "_render", render)
+    return rendered
+
+
+def _document(text: str, image_path) -> Document:
+    return Document(
+        slug="article",
+        title="Article",
+        elements=[Paragraph(text=text), Image(path=str(image_path))],
+        references=[],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+
+
+def _write(document: Document, cache_path, profile: str = "final") -> bytes:
+    stream = BytesIO()
+    pdf.PdfTransformer(document, cache_path.parent, cache_path=cache_path, profile=profile).write(stream)
+    return stream.getvalue()
+
+
+def test_cache_hits_and_misses(tmp_path, renders):
+    cache_path = tmp_path / "pdf"
+    image_path = tmp_path / "image.png"
+    image_path.write_bytes(b"image")
+
+    content = _write(_document("Text.", image_path), cache_path)
+    assert _write(_document("Text.", image_path), cache_path) == content
+    assert len(renders) == 1
+
+    _write(_document("Other text.", image_path), cache_path)
+    assert len(renders) == 2
+
+    image_path.write_bytes(b"other image")
+    _write(_document("Text.", image_path), cache_path)
+    assert len(renders) == 3
+
+    assert _write(_document("Text.", image_path), cache_path, profile="draft").startswith(b"draft:")
+    assert len(renders) == 4
+
+    assert len(list(cache_path.glob("*.pdf"))) == 4
+    assert not list(cache_path.glob(".*"))
+
+
+def test_failed_renderings_leave_no_files(tmp_path, monkeypatch):
+    def render(self, html: str, target) -> None:
+        target.write(b"partial")
+        raise RuntimeError("rendering failed")
+
+    monkeypatch.setattr(pdf.PdfTransformer, "_render", render)
+
+    with pytest.raises(RuntimeError):
+        _write(_document("Text.", tmp_path / "missing.png"), tmp_path / "pdf")
+
+    assert not list((tmp_path / "pdf").iterdir())
+
+
+def test_prune_removes_the_least_recently_used_pdfs(tmp_path):
+    for i, name in enumerate(["old", "used", "new"]):
+        (tmp_path / f"{name}.pdf").write_bytes(b"x" * 100)
+        os.utime(tmp_path / f"{name}.pdf", (i, i))
+
+    (tmp_path / ".killed.tmp").write_bytes(b"x")
+    os.utime(tmp_path / ".killed.tmp", (0, 0))
+    (tmp_path / ".rendering.tmp").write_bytes(b"x")
+    os.utime(tmp_path / "used.pdf")  # read from the cache
+
+    pdf.prune_pdf_cache(tmp_path, max_size=150)
+
+    assert sorted(file.name for file in tmp_path.iterdir()) == [".rendering.tmp", "used.pdf"]
@@ -0,0 +1,68 @@
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from hipeac_press.prefetch import _page_weight, set_prefetch_hints
+from hipeac_press.type_definitions import Document, Image, Paragraph, PrefetchHint, Reference
+
+
+def _item(slug: str, elements: list, references: list[Reference] | None = None) -> SimpleNamespace:
+    document = Document(
+        slug=slug,
+        title=slug,
+        elements=elements,
+        references=references or [],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    return SimpleNamespace(slug=slug, document=document)
+
+
+def _images(tmp_path, sizes: list[int]) -> list[Image]:
+    (tmp_path / "next").mkdir()
+    images = []
+
+    for i, size in enumerate(sizes):
+        path = tmp_path / "next" / f"image{i}.png"
+        path.write_bytes(b"x" * size)
+        images.append(Image(path=str(path), caption="Caption"))
+
+    return images
+
+
+def test_page_weight_counts_texts_and_references():
+    item = _item("a", [Paragraph(text="éé"), Image(path="images/a/x.png", caption="abc")], [Reference("R1", "ref")])
+
+    assert _page_weight(item.document) == 4 + 3 + len("R1 ref")
+
+
+def test_hints_use_the_absolute_image_urls(tmp_path):
+    first, second = _item("first", []), _item("next", [Paragraph(text="Text."), *_images(tmp_path, [10])])
+    set_prefetch_hints([{"items": [first, second]}])
+
+    assert first.document.prefetch == [
+        PrefetchHint(href="/next"),
+        PrefetchHint(href="/images/next/image0.png", type="image"),
+    ]
+    assert second.document.prefetch == []
+
+
+def test_hints_stop_at_the_budget(tmp_path):
+    text = Paragraph(text="x" * 100)
+    first, second = _item("first", []), _item("next", [text, *_images(tmp_path, [50, 50, 10])])
+
+    set_prefetch_hints([{"items": [first, second]}], budget=99)
+    assert first.document.prefetch == []
+
+    # the page and its first image fit, the second image does not, and no later image is hinted
+    set_prefetch_hints([{"items": [first, second]}], budget=100 + 3 * 7 + 60)
+    assert [hint.href for hint in first.document.prefetch] == ["/next", "/images/next/image0.png"]
+
+
+def test_hints_are_limited_to_max_images(tmp_path):
+    first, second = _item("first", []), _item("next", _images(tmp_path, [1, 1, 1, 1]))
+    set_prefetch_hints([{"items": [first, second]}], max_images=2)
+
+    assert [hint.href for hint in first.document.prefetch] == [
+        "/next",
+        "/images/next/image0.png",
+        "/images/next/image1.png",
+    ]
@@ -0,0 +1,80 @@
+import json
+import zipfile
+from pathlib import Path
+
+from docx import Document as DocxDocument
+from PIL import Image
+
+from hipeac_press.docx import DocxConverter
+from hipeac_press.preflight import check_docx, preflight
+
+
+def _docx(folder: Path, paragraphs: list[str], *, title: str | None = "Article", image: bool = False) -> Path:
+    folder.mkdir(parents=True, exist_ok=True)
+    document = DocxDocument()
+    document.add_heading("Article", 1)
+
+    for text in paragraphs:
+        document.add_paragraph(text)
+
+    if image:
+        Image.new("RGB", (40, 30), "red").save(folder / "image.png")
+        document.add_picture(str(folder / "image.png"))
+
+    document.save(folder / "article.docx")
+    if title:
+        (folder / "metadata.json").write_text(json.dumps({"title": title}))
+
+    return folder / "article.docx"
+
+
+def test_clean_document_passes_like_the_conversion(tmp_path):
+    paragraphs = ["Text citing [R1] and [R1, R2].", "References", "[R1] A paper", "[R2] Another paper"]
+    docx_path = _docx(tmp_path / "article", paragraphs, image=True)
+    metadata_path = docx_path.parent / "metadata.json"
+    converter = DocxConverter(docx_path, img_folder=tmp_path / "images", metadata_path=metadata_path)
+
+    assert check_docx(docx_path, metadata_path) == converter.errors == []
+
+
+def test_unsupported_images(tmp_path):
+    docx_path = _docx(tmp_path / "article", ["Text."])
+    with zipfile.ZipFile(docx_path, "a") as zip_file:
+        zip_file.writestr("word/media/image1.EMF", b"emf")
+
+    assert check_docx(docx_path, docx_path.parent / "metadata.json") == [".emf image format not supported: image1.EMF"]
+
+
+def test_missing_title(tmp_path):
+    docx_path = _docx(tmp_path / "article", ["Text."], title=None)
+
+    assert check_docx(docx_path, docx_path.parent / "metadata.json") == [
+        "Missing title: set it in metadata.json or in the document properties"
+    ]
+
+
+def test_reference_and_citation_problems(tmp_path):
+    paragraphs = ["Text citing [R1] and [R3].", "References", "[R1] A paper", "broken reference", "[R2] Never cited"]
+    docx_path = _docx(tmp_path / "article", paragraphs)
+
+    assert check_docx(docx_path, docx_path.parent / "metadata.json") == [
+        "Failed to parse reference: broken reference, error: list index out of range",
+        "Citation without reference: [R3]",
+        "Reference never cited: [R2]",
+    ]
+
+
+def test_invalid_docx(tmp_path):
+    (tmp_path / "article.docx").write_bytes(b"not a zip")
+
+    assert check_docx(tmp_path / "article.docx", tmp_path / "metadata.json")[0].startswith("Not a valid DOCX file")
+
+
+def test_preflight_checks_every_document(tmp_path):
+    _docx(tmp_path / "01 Section" / "a", ["Cites [X]."])
+    _docx(tmp_path / "01 Section" / "b", ["Text."])
+
+    assert preflight(tmp_path, workers=2) == {
+        tmp_path / "01 Section" / "a" / "article.docx": ["Citation without reference: [X]"],
+        tmp_path / "01 Section" / "b" / "article.docx": [],
+    }
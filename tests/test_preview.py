@@ -0,0 +1,42 @@
+from datetime import UTC, datetime
+
+from docx import Document as DocxDocument
+
+from hipeac_press.preview import PreviewCache, PreviewService
+
+
+def test_cache_evicts_least_recently_used():
+    cache = PreviewCache(max_size=10)
+    cache.set(("a", "html"), (b"aaaa", []))
+    cache.set(("b", "html"), (b"bbbb", []))
+    cache.get(("a", "html"))
+    cache.set(("c", "html"), (b"cccc", []))
+
+    assert cache.get(("b", "html")) is None
+    assert cache.get(("a", "html")) == (b"aaaa", [])
+    assert cache.size == 8
+
+
+def test_cache_keeps_an_entry_larger_than_its_size():
+    cache = PreviewCache(max_size=2)
+    cache.set(("a", "html"), (b"aaaa", ["error"]))
+
+    assert cache.get(("a", "html")) == (b"aaaa", ["error"])
+
+
+def test_service_caches_by_content(tmp_path, monkeypatch):
+    docx = DocxDocument()
+    docx.core_properties.title = "Preview"
+    docx.core_properties.modified = datetime(2025, 1, 1, tzinfo=UTC)
+    docx.add_paragraph("Text.")
+    docx.save(tmp_path / "article.docx")
+
+    service = PreviewService(tmp_path / "work")
+    conversions = []
+    convert = service._convert
+    monkeypatch.setattr(service, "_convert", lambda *args: conversions.append(args) or convert(*args))
+
+    html, errors = service.preview(tmp_path / "article.docx")
+    assert b"<p>Text.</p>" in html
+    assert service.preview_upload((tmp_path / "article.docx").read_bytes()) == (html, errors)
+    assert len(conversions) == 1
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from hipeac_press.utils.processes import process_context
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def test_process_context_does_not_fork_the_parent():
+    context = process_context()
+
+    assert context.get_start_method() in {"forkserver", "spawn"}
+
+    with context.Pool(2) as pool:
+        assert pool.map(_square, range(4)) == [0, 1, 4, 9]
+
+
+def test_preloaded_modules_are_imported_by_the_fork_server(tmp_path):
+    # a script of its own, as the fork server of this process may have been started by other tests
+    script = tmp_path / "script.py"
+    script.write_text(
+        """
+import sys
+from hipeac_press.utils.processes import preload, process_context
+
+def imported(module):
+    return module in sys.modules
+
+if __name__ == "__main__":
+    preload("hipeac_press.transformers.preload")
+    context = process_context()
+    if context.get_start_method() == "forkserver":
+        with context.Pool(1) as pool:
+            assert pool.map(imported, ["hipeac_press.transformers.preload"]) == [True]
+"""
+    )
+
+    env = {**os.environ, "PYTHONPATH": str(Path(__file__).parents[1])}
+    subprocess.run([sys.executable, str(script)], check=True, timeout=120, env=env)
@@ -0,0 +1,50 @@
+import json
+
+from docx import Document as DocxDocument
+
+from hipeac_press.reader import Reader
+
+
+def _docx(folder, title: str, *, name: str | None = None) -> None:
+    folder.mkdir(parents=True, exist_ok=True)
+    document = DocxDocument()
+    document.add_heading(title, 1)
+    document.add_paragraph(f"Some text about {title} [Ref1].")
+    document.add_paragraph("References")
+    document.add_paragraph("[Ref1] A reference")
+    document.save(folder / f"{name or title}.docx")
+    (folder / "metadata.json").write_text(json.dumps({"title": title}))
+
+
+def _tree(reader: Reader) -> list:
+    return [
+        (
+            section["text"],
+            section["collapsed"],
+            [(item.slug, item.document, item.errors) for item in section["items"]],
+        )
+        for section in reader.tree
+    ]
+
+
+def test_parallel_and_serial_reading_give_the_same_tree(tmp_path):
+    source = tmp_path / "source"
+    _docx(source / "01 Introduction" / "b", "Foreword")
+    _docx(source / "01 Introduction" / "a", "Recommendations")
+    _docx(source / "01 Introduction" / "a" / "tracked", "Tracked")
+    _docx(source / "02C Chapters" / "x", "Alpha chapter")
+    _docx(source / "02C Chapters" / "x" / "nested", "Nested chapter")
+    _docx(source / "02C Chapters" / "y", "Beta chapter")
+    _docx(source / "02C Chapters" / "y", "Beta chapter", name="~$Beta chapter")
+    _docx(source / ".hidden", "Hidden")
+
+    serial = Reader(source, tmp_path / "images")
+    parallel = Reader(source, tmp_path / "images", workers=3)
+    tree = _tree(serial)
+
+    assert tree == _tree(parallel)
+    assert serial.manifest.sections == parallel.manifest.sections
+    assert [(text, collapsed, [slug for slug, _, _ in items]) for text, collapsed, items in tree] == [
+        ("Introduction", False, ["introduction--recommendations", "introduction--foreword"]),
+        ("Chapters", True, ["chapters--alpha-chapter", "chapters--nested-chapter", "chapters--beta-chapter"]),
+    ]
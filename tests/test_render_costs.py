@@ -0,0 +1,30 @@
+import threading
+
+from hipeac_press.utils.render_costs import BASE_SECONDS, RenderCosts, run_longest_first
+
+
+def test_estimate_from_history(tmp_path):
+    costs = RenderCosts(tmp_path / "costs.json")
+    costs.record("a", seconds=10.0, pages=5)
+    costs.record("b", pages=4)
+    costs.save()
+    costs = RenderCosts(tmp_path / "costs.json")
+
+    assert costs.estimate("a", docx_size=0, images=0) == 10.0
+    assert costs.estimate("b", docx_size=0, images=0) == 8.0  # 4 pages at 2 seconds per page
+    assert costs.estimate("c", docx_size=2**20, images=2) > costs.estimate("d", docx_size=0, images=0) == BASE_SECONDS
+
+
+def test_run_longest_first():
+    started = []
+    lock = threading.Lock()
+
+    def run(name: str) -> float:
+        with lock:
+            started.append(name)
+        return 1.0
+
+    timings = run_longest_first({"short": 1.0, "long": 9.0, "medium": 5.0}, run, workers=1)
+
+    assert started == ["long", "medium", "short"]
+    assert timings == {"long": 1.0, "medium": 1.0, "short": 1.0}
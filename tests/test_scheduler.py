@@ -0,0 +1,83 @@
+import threading
+
+import pytest
+
+from hipeac_press.utils.scheduler import Scheduler
+
+
+def test_stages_run_after_their_dependencies():
+    scheduler = Scheduler(max_workers=4)
+    order = []
+
+    @scheduler.stage(inputs=["a", "b"], outputs=["c"])
+    def last():
+        order.append("last")
+
+    @scheduler.stage(inputs=["a"], outputs=["b"])
+    def middle():
+        order.append("middle")
+
+    @scheduler.stage(outputs=["a"])
+    def first():
+        order.append("first")
+
+    scheduler.run()
+
+    assert order == ["first", "middle", "last"]
+    assert scheduler.dependencies() == {"first": set(), "middle": {"first"}, "last": {"first", "middle"}}
+    assert scheduler.critical_path() == ["first", "middle", "last"]
+
+
+def test_independent_stages_run_concurrently():
+    scheduler = Scheduler(max_workers=2)
+    barrier = threading.Barrier(2, timeout=5)
+
+    @scheduler.stage(outputs=["a"])
+    def left():
+        barrier.wait()
+
+    @scheduler.stage(outputs=["b"])
+    def right():
+        barrier.wait()
+
+    scheduler.run()  # would time out if the stages ran one after the other
+
+
+def test_failed_stage_stops_the_build():
+    scheduler = Scheduler(max_workers=2)
+    ran = []
+
+    @scheduler.stage(outputs=["a"])
+    def failing():
+        raise RuntimeError("failed")
+
+    @scheduler.stage(inputs=["a"], outputs=["b"])
+    def dependent():
+        ran.append("dependent")
+
+    with pytest.raises(RuntimeError, match="failed"):
+        scheduler.run()
+
+    assert ran == []
+
+
+def test_invalid_graphs():
+    scheduler = Scheduler()
+    scheduler.stage(inputs=["missing"], outputs=["a"], name="orphan")(lambda: None)
+
+    with pytest.raises(ValueError, match="no stage produces"):
+        scheduler.dependencies()
+
+    scheduler = Scheduler()
+    scheduler.stage(outputs=["a"], name="one")(lambda: None)
+    scheduler.stage(outputs=["a"], name="two")(lambda: None)
+
+    with pytest.raises(ValueError, match="produced by"):
+        scheduler.dependencies()
+
+    scheduler = Scheduler()
+    scheduler.stage(inputs=["b"], outputs=["a"], name="one")(lambda: None)
+    scheduler.stage(inputs=["a"], outputs=["b"], name="two")(lambda: None)
+
+    with pytest.raises(ValueError, match="circular"):
+        scheduler.run()
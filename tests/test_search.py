@@ -0,0 +1,61 @@
+import json
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+from hipeac_press.type_definitions import Document, Header, Paragraph, Reference
+from hipeac_press.utils.search import build_search_index, generate_search_index, tokenize
+from hipeac_press.utils.slug import heading_slugify
+
+
+def _tree() -> list[dict]:
+    document = Document(
+        slug="article",
+        title="Index of things",
+        elements=[
+            Paragraph(text="Computing at the edge."),
+            Header(level=2, text="2. **Énergie** & power"),
+            Paragraph(text="Energy efficiency."),
+            Header(level=2, text="References"),
+            Paragraph(text="Computing again."),
+        ],
+        references=[Reference(code="R1", text="Cloud paper")],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    return [{"text": "Section", "items": [SimpleNamespace(slug="article", title=document.title, document=document)]}]
+
+
+def test_tokenize():
+    assert tokenize("The **Énergie** of a *cloud*, in 2025!") == ["energie", "cloud", "2025"]
+
+
+def test_heading_slugify_matches_vitepress():
+    assert heading_slugify("Hello World!") == "hello-world"
+    assert heading_slugify("2. Énergie & power") == "_2-energie-power"
+    assert heading_slugify("What’s new? C++/Rust") == "what-s-new-c-rust"
+
+
+def test_anchors_are_the_ids_of_the_vitepress_headings():
+    documents, index = build_search_index(_tree())
+
+    assert documents == [["article", "Index of things"]]
+    assert index["computing"] == [[0, ""], [0, "references"]]
+    assert index["efficiency"] == [[0, "_2-energie-power"]]
+    assert index["cloud"] == [[0, "references-1"]]  # the references header added by the markdown transformer
+
+
+def test_shards_do_not_overwrite_the_index(tmp_path):
+    (tmp_path / "stale.json").write_text("{}")
+    index_path = generate_search_index(_tree(), tmp_path, prefix_length=5)
+    manifest = json.loads(index_path.read_text())
+
+    assert index_path == tmp_path / "index.json"
+    assert manifest["prefix_length"] == 5
+    assert manifest["documents"] == [["article", "Index of things"]]
+    assert "index" in manifest["shards"]
+    assert not (tmp_path / "stale.json").exists()
+
+    for key in manifest["shards"]:
+        shard = json.loads((tmp_path / "shards" / f"{key}.json").read_text())
+        assert shard and all(term.startswith(key) for term in shard)
+
+    assert json.loads((tmp_path / "shards" / "index.json").read_text()) == {"index": [[0, ""]]}
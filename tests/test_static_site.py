@@ -0,0 +1,125 @@
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from hipeac_press.docx import DocxConverter
+from hipeac_press.manifest import SiteManifest
+from hipeac_press.type_definitions import Document, Image, Paragraph, PrefetchHint
+from hipeac_press.utils.static_site import generate_static_site, read_markdown
+
+
+INDEX_MD = """---
+layout: home
+
+hero:
+  name: HiPEAC Vision 2025
+  text: The future of computing
+  image:
+    src: /cover.jpg
+    alt: Cover
+  actions:
+    - theme: brand
+      text: Read online
+      link: /chapters--first
+features:
+  - title: First chapter
+    details: About computing
+    link: /chapters--first
+---
+
+Welcome.
+"""
+
+
+def _converter(title: str, elements: list, prefetch: list[PrefetchHint]) -> DocxConverter:
+    document = Document(
+        slug=f"chapters--{title.lower()}",
+        title=title,
+        elements=elements,
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+        prefetch=prefetch,
+    )
+    return DocxConverter.from_document(Path("x.docx"), document, img_folder=Path("images"), section_name="Chapters")
+
+
+@pytest.fixture
+def build(tmp_path):
+    build_path = tmp_path / "build"
+    (build_path / "images" / "second").mkdir(parents=True)
+    (build_path / "images" / "second" / "image.png").write_bytes(b"image")
+    (build_path / "index.md").write_text(INDEX_MD)
+    (tmp_path / "public").mkdir()
+    (tmp_path / "public" / "book.pdf").write_bytes(b"pdf")
+
+    image = Image(path=str(build_path / "images" / "second" / "image.png"))
+    hints = [PrefetchHint(href="/chapters--second"), PrefetchHint(href="/images/second/image.png", type="image")]
+    tree = [
+        {
+            "text": "Chapters",
+            "items": [
+                _converter("First", [Paragraph(text="First.")], hints),
+                _converter("Second", [Paragraph(text="Second."), image], []),
+            ],
+        }
+    ]
+
+    def generate():
+        return generate_static_site(
+            tree,
+            SiteManifest.from_tree(tree),
+            tmp_path / "html",
+            build_path=build_path,
+            public_path=tmp_path / "public",
+            year="2025",
+        )
+
+    return generate, tmp_path / "html"
+
+
+def test_read_markdown(tmp_path):
+    (tmp_path / "page.md").write_text("---\ntitle: Page\n---\n\n# Page\n")
+
+    assert read_markdown(tmp_path / "page.md") == ({"title": "Page"}, "\n# Page\n")
+    assert read_markdown(tmp_path / "missing.md") == ({}, "")
+
+
+def test_pages_use_hashed_assets(build):
+    generate, html_path = build
+    generate()
+
+    assets = sorted(path.name for path in (html_path / "assets").iterdir())
+    assert [name.split(".")[0] for name in assets] == ["image", "site"]
+    image = next(name for name in assets if name.startswith("image."))
+
+    second = (html_path / "chapters--second.html").read_text()
+    assert f"<img src='/assets/{image}' />" in second
+    assert "/images/" not in second
+
+    head, body = (html_path / "chapters--first.html").read_text().split("</head>")
+    assert "<link rel='prefetch' href='/chapters--second' as='document' />" in head
+    assert f"<link rel='prefetch' href='/assets/{image}' as='image' />" in head
+    assert "prefetch" not in body
+
+
+def test_home_page_renders_the_frontmatter(build):
+    generate, html_path = build
+    generate()
+    home = (html_path / "index.html").read_text()
+
+    assert "layout: home" not in home
+    assert "<h1 class='name'>HiPEAC Vision 2025</h1>" in home
+    assert "<a class='action brand' href='/chapters--first'>Read online</a>" in home
+    assert "<img src='/cover.jpg' alt='Cover' />" in home
+    assert "<a class='feature' href='/chapters--first'><h2>First chapter</h2><p>About computing</p></a>" in home
+    assert "<p>Welcome.</p>" in home
+    assert "<a href='/chapters'>Chapters</a>" in home
+
+
+def test_unchanged_pages_are_skipped(build):
+    generate, html_path = build
+    changed = generate()
+
+    assert "chapters--first.html" in changed
+    assert "book.pdf" in changed
+    assert generate() == []
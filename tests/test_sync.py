@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+
+from hipeac_press.utils.sync import copy_file, mirror, write_errors
+
+
+def test_mirror_copies_only_new_or_changed_files(tmp_path):
+    source, destination = tmp_path / "source", tmp_path / "destination"
+    (source / "article").mkdir(parents=True)
+    (source / "article" / "article.docx").write_bytes(b"docx")
+    (source / "index.md").write_text("# Index")
+    (source / ".hidden").write_text("hidden")
+
+    assert sorted(mirror(source, destination)) == [Path("article/article.docx"), Path("index.md")]
+    assert not (destination / ".hidden").exists()
+    assert mirror(source, destination) == []
+
+    (source / "index.md").write_text("# Changed index")
+    assert mirror(source, destination) == [Path("index.md")]
+    assert (destination / "index.md").read_text() == "# Changed index"
+
+
+def test_mirror_removes_deleted_files_and_folders(tmp_path):
+    source, destination = tmp_path / "source", tmp_path / "destination"
+    (source / "article").mkdir(parents=True)
+    (source / "article" / "article.docx").write_bytes(b"docx")
+    mirror(source, destination)
+
+    (source / "article" / "article.docx").unlink()
+    (source / "article").rmdir()
+    (source / "index.md").write_text("# Index")
+    mirror(source, destination)
+
+    assert sorted(path.name for path in destination.rglob("*")) == ["index.md"]
+
+
+def test_copy_file_with_checksum(tmp_path):
+    source, target = tmp_path / "source.txt", tmp_path / "copy" / "target.txt"
+    source.write_text("aaaa")
+
+    assert copy_file(source, target)
+    assert not copy_file(source, target, checksum=True)
+
+    source.write_text("bbbb")  # same size
+    os.utime(source, ns=(target.stat().st_atime_ns, target.stat().st_mtime_ns))
+
+    assert not copy_file(source, target)
+    assert copy_file(source, target, checksum=True)
+    assert target.read_text() == "bbbb"
+
+
+def test_write_errors_only_on_change(tmp_path):
+    path, mirror_path = tmp_path / "errors.txt", tmp_path / "mirror.txt"
+
+    assert write_errors(["a", "b"], path, mirror_path=mirror_path)
+    assert path.read_text() == mirror_path.read_text() == "a\nb"
+    assert not write_errors(["a", "b"], path, mirror_path=mirror_path)
+
+    assert write_errors([], path, mirror_path=mirror_path)
+    assert not path.exists() and not mirror_path.exists()
+    assert not write_errors([], path)
@@ -0,0 +1,36 @@
+import os
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from hipeac_press.docx import DocxConverter
+from hipeac_press.type_definitions import Document, Paragraph
+from hipeac_press.utils.memory import process_rss
+from hipeac_press.utils.watchdog import render_with_watchdog
+
+
+def _converter() -> DocxConverter:
+    document = Document(
+        slug="article",
+        title="Article",
+        elements=[Paragraph(text="Text.")],
+        references=[],
+        updated_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+    return DocxConverter.from_document(Path("article.docx"), document, img_folder=Path("images"))
+
+
+def test_render_in_child_process(tmp_path):
+    item = _converter()
+    render_with_watchdog(item, tmp_path / "article.md", format="md", timeout=60)
+
+    assert item.errors == []
+    assert (tmp_path / "article.md").read_bytes() == item.export(format="md")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="the RSS is read from /proc")
+def test_process_rss():
+    assert process_rss(os.getpid()) > 0
+    assert process_rss(2**22 + 1) is None